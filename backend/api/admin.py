@@ -1,20 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
 from django.contrib import admin
 from django.shortcuts import render, redirect
 from django.urls import path
 from django import forms
 from django.contrib import messages
+from django.utils.dateparse import parse_date
 
+from . import rollups, search, stats
+from .authentication import invalidate_user
+from .cache import items_changed
 from .models import Admin as Neo4jAdmin, Supplier, Grocery, Item, DailyIncome
+from .queries import NodeQuery
+from .transactions import atomic
 from .admin_utils import (
-    is_supplier_user,
-    is_admin_user,
-    get_supplier_grocery_for_user,
-    filter_objects_for_supplier,
+    admin_scope,
     sync_django_user_for_admin,
     sync_django_user_for_supplier,
     deactivate_django_user_by_email,
 )
 
+# Full-text index (see api.search) behind each changelist's search box
+SEARCH_KINDS = {
+    "Item": "item",
+    "Grocery": "grocery",
+    "Admin": "user",
+    "Supplier": "user",
+}
+
+CHANGELIST_PER_PAGE = 100
+
+# Columns each changelist can be sorted on with ?o=[-]<property>
+SORTABLE = {
+    "Grocery": ("name", "created_at"),
+    "Admin": ("name", "email", "created_at"),
+    "Supplier": ("name", "email", "created_at"),
+    "Item": ("name", "created_at"),
+    "DailyIncome": ("created_at",),
+}
+DEFAULT_SORT = "-created_at"
+
+# Day windows the daily income dashboard offers with ?days=
+INCOME_WINDOWS = (7, 30, 90, 365)
+DEFAULT_INCOME_WINDOW = 30
+
 
 class Neo4jModelAdmin:
     def __init__(self, model, admin_site):
@@ -93,74 +122,67 @@ class Neo4jModelAdmin:
         return forms.Form
 
     def changelist_view(self, request):
-        def is_supplier(u):
-            return is_supplier_user(u)
-
-        def is_admin(u):
-            return is_admin_user(u)
-
+        scope = admin_scope(request)
         model_name = self.model.__name__
-        if not (
-            is_admin(request.user)
-            or (is_supplier(request.user) and model_name in ["Item", "DailyIncome"])
-        ):
+        if not scope.can_manage(model_name):
             messages.error(request, "You don't have permission to view this page.")
             return redirect("/admin/")
 
         try:
-            objects = list(self.model.nodes.all())
+            search_query = request.GET.get("q", "").strip()
+            query = self._changelist_query(request, search_query)
+            object_count = query.count() if query is not None else 0
 
-            print(f"Found {len(objects)} {self.model.__name__} objects")
-            for obj in objects[:3]:
-                print(f"  - {obj}")
+            sortable = SORTABLE.get(model_name, ("created_at",))
+            sort = request.GET.get("o", DEFAULT_SORT)
+            if sort.lstrip("-") not in sortable:
+                sort = DEFAULT_SORT
+            sort_key = f"n.{sort.lstrip('-')}"
 
-            if is_supplier(request.user) and model_name in ["Item", "DailyIncome"]:
-                objects = filter_objects_for_supplier(objects, model_name, request.user)
+            num_pages = max(1, -(-object_count // CHANGELIST_PER_PAGE))
+            try:
+                page = min(max(int(request.GET.get("p", 1)), 1), num_pages)
+            except ValueError:
+                page = 1
+            offset = (page - 1) * CHANGELIST_PER_PAGE
+            objects = []
+            if object_count:
+                objects = query.fetch(
+                    order_by=[
+                        f"{sort_key} DESC" if sort.startswith("-") else sort_key,
+                        "n.uid",
+                    ],
+                    limit=CHANGELIST_PER_PAGE,
+                    skip=offset,
+                )
 
             context = {
                 "title": f"{self.model.__name__} List",
                 "objects": objects,
                 "model_name": self.model.__name__,
                 "opts": {"verbose_name_plural": f"{self.model.__name__}s"},
-                "object_count": len(objects),
+                "object_count": object_count,
                 "can_add": True,
+                "searchable": model_name in SEARCH_KINDS,
+                "search_query": search_query,
+                "sort_links": self._sort_links(request, sortable, sort),
+                "page": page,
+                "num_pages": num_pages,
+                "first_row": offset + 1 if objects else 0,
+                "last_row": offset + len(objects),
+                "prev_page_url": (
+                    self._changelist_url(request, p=page - 1) if page > 1 else None
+                ),
+                "next_page_url": (
+                    self._changelist_url(request, p=page + 1)
+                    if page < num_pages
+                    else None
+                ),
             }
 
             if self.model.__name__ == "DailyIncome":
-                from datetime import datetime
-
-                daily_totals = {}
-                grand_total = 0.0
-                for inc in objects:
-                    try:
-                        day_key = str(inc.date.date()) if inc.date else None
-                        if not day_key:
-                            continue
-                        daily_totals[day_key] = daily_totals.get(day_key, 0.0) + float(
-                            inc.amount or 0.0
-                        )
-                        grand_total += float(inc.amount or 0.0)
-                    except Exception:
-                        continue
-
-                today_key = str(datetime.utcnow().date())
-                today_total = daily_totals.get(today_key, 0.0)
-
-                sorted_totals = [
-                    {"date": k, "total": v}
-                    for k, v in sorted(
-                        daily_totals.items(), key=lambda x: x[0], reverse=True
-                    )
-                ]
-
-                context.update(
-                    {
-                        "daily_totals": sorted_totals,
-                        "today_total": today_total,
-                        "grand_total": grand_total,
-                        "can_add": is_supplier(request.user),
-                    }
-                )
+                context.update(self._income_summary(request))
+                context["can_add"] = scope.is_supplier
             return render(request, "admin/neo4j_changelist.html", context)
         except Exception as e:
             print(f"Error in changelist_view for {self.model.__name__}: {e}")
@@ -173,18 +195,112 @@ class Neo4jModelAdmin:
             }
             return render(request, "admin/neo4j_changelist.html", context)
 
-    def change_view(self, request, object_id):
-        def is_supplier(u):
-            return is_supplier_user(u)
+    def _changelist_query(self, request, search_query):
+        """NodeQuery for the rows a changelist lists, with search and
+        supplier scoping applied in Cypher; ``None`` if there are none."""
+        model_name = self.model.__name__
+        label = self.model.__label__
+        if search_query and model_name in SEARCH_KINDS:
+            query = search.node_query(SEARCH_KINDS[model_name], search_query)
+            if query is None:
+                return None
+            query = query.filter(f"n:{label}")
+        else:
+            query = NodeQuery(f"MATCH (n:{label})")
+
+        scope = admin_scope(request)
+        if scope.is_supplier and model_name in ["Item", "DailyIncome"]:
+            if scope.grocery_uid is None:
+                return None
+            relationship = "HAS_ITEM" if model_name == "Item" else "HAS_INCOME"
+            query = query.filter(
+                f"EXISTS {{ (:Grocery {{uid: $scope_grocery}})-[:{relationship}]->(n) }}",
+                scope_grocery=scope.grocery_uid,
+            )
+        return query
+
+    def _income_summary(self, request):
+        """Daily income dashboard context: per-day totals for the window
+        ending at ``?until=`` (default today) and spanning ``?days=``, plus
+        today's and the lifetime total, all aggregated by api.rollups."""
+        today = datetime.now(timezone.utc).date()
+        try:
+            until = parse_date(request.GET.get("until", "")) or today
+        except ValueError:
+            # Well formed but impossible, e.g. 2024-02-30
+            until = today
+        until = min(until, today)
+        try:
+            days = int(request.GET.get("days", DEFAULT_INCOME_WINDOW))
+        except ValueError:
+            days = DEFAULT_INCOME_WINDOW
+        if days not in INCOME_WINDOWS:
+            days = DEFAULT_INCOME_WINDOW
+        first_day = until - timedelta(days=days - 1)
+
+        scope = admin_scope(request)
+        grocery_uid = scope.grocery_uid
+        if scope.is_supplier and grocery_uid is None:
+            return {"daily_totals": [], "today_total": 0.0, "grand_total": 0.0}
+
+        totals = rollups.daily_totals(first_day, until, grocery_uid)
+        if first_day <= today <= until:
+            today_total = dict(totals).get(today.isoformat(), 0.0)
+        else:
+            today_total = dict(rollups.daily_totals(today, today, grocery_uid)).get(
+                today.isoformat(), 0.0
+            )
+        later = until + timedelta(days=days)
+        return {
+            "daily_totals": [{"date": day, "total": total} for day, total in totals],
+            "today_total": today_total,
+            "grand_total": rollups.grand_total(grocery_uid),
+            "window_start": first_day,
+            "window_end": until,
+            "window_links": [
+                {
+                    "days": choice,
+                    "url": self._changelist_url(request, days=choice),
+                    "current": choice == days,
+                }
+                for choice in INCOME_WINDOWS
+            ],
+            "earlier_url": self._changelist_url(
+                request, until=(first_day - timedelta(days=1)).isoformat()
+            ),
+            "later_url": (
+                self._changelist_url(request, until=min(later, today).isoformat())
+                if until < today
+                else None
+            ),
+        }
 
-        def is_admin(u):
-            return is_admin_user(u)
+    def _changelist_url(self, request, **changes):
+        params = request.GET.copy()
+        for key, value in changes.items():
+            params[key] = value
+        if "o" in changes:
+            params.pop("p", None)
+        return f"?{params.urlencode()}"
+
+    def _sort_links(self, request, sortable, sort):
+        """Header link and current direction for each sortable column."""
+        links = {}
+        for prop in sortable:
+            direction = None
+            if sort.lstrip("-") == prop:
+                direction = "desc" if sort.startswith("-") else "asc"
+            toggled = prop if direction == "desc" else f"-{prop}"
+            links[prop] = {
+                "url": self._changelist_url(request, o=toggled),
+                "direction": direction,
+            }
+        return links
 
+    def change_view(self, request, object_id):
+        scope = admin_scope(request)
         model_name = self.model.__name__
-        if not (
-            is_admin(request.user)
-            or (is_supplier(request.user) and model_name in ["Item", "DailyIncome"])
-        ):
+        if not scope.can_manage(model_name):
             messages.error(request, "You don't have permission to view this page.")
             return redirect("/admin/")
 
@@ -261,17 +377,9 @@ class Neo4jModelAdmin:
             return render(request, "admin/neo4j_change.html", context)
 
     def add_view(self, request):
-        def is_supplier(u):
-            return is_supplier_user(u)
-
-        def is_admin(u):
-            return is_admin_user(u)
-
+        scope = admin_scope(request)
         model_name = self.model.__name__
-        if not (
-            is_admin(request.user)
-            or (is_supplier(request.user) and model_name in ["Item", "DailyIncome"])
-        ):
+        if not scope.can_manage(model_name):
             messages.error(request, "You don't have permission to add records.")
             return redirect("/admin/")
 
@@ -311,14 +419,7 @@ class Neo4jModelAdmin:
 
                         grocery_id = data.get("grocery_id")
                         if grocery_id:
-                            try:
-                                grocery = Grocery.nodes.get(uid=grocery_id)
-                                existing = obj.responsible_for.single()
-                                if existing:
-                                    obj.responsible_for.disconnect(existing)
-                                obj.responsible_for.connect(grocery)
-                            except Grocery.DoesNotExist:
-                                pass
+                            Supplier.assign_grocery(obj.uid, grocery_id)
                     elif self.model.__name__ == "Item":
                         obj = Item(
                             name=data["name"],
@@ -327,19 +428,16 @@ class Neo4jModelAdmin:
                             price=data["price"],
                         )
                         obj.save()
-                        is_sup = is_supplier_user(request.user)
-
-                        if is_sup:
+                        # Listed unscoped even before it is attached
+                        items_changed(None, [obj.uid])
+                        if scope.is_supplier:
                             try:
-                                supplier_grocery = get_supplier_grocery_for_user(
-                                    request.user
-                                )
-                                if not supplier_grocery:
+                                if not scope.grocery_uid:
                                     messages.error(
                                         request, "No grocery assigned to supplier"
                                     )
                                     return redirect(request.path.replace("add/", ""))
-                                supplier_grocery.items.connect(obj)
+                                rollups.attach_item(scope.grocery_uid, obj.uid)
                             except Exception:
                                 messages.error(
                                     request, "Could not assign item to supplier grocery"
@@ -349,25 +447,20 @@ class Neo4jModelAdmin:
                             if grocery_id:
                                 try:
                                     grocery = Grocery.nodes.get(uid=grocery_id)
-                                    grocery.items.connect(obj)
+                                    rollups.attach_item(grocery.uid, obj.uid)
                                 except Grocery.DoesNotExist:
                                     pass
                     elif self.model.__name__ == "DailyIncome":
                         obj = DailyIncome(date=data["date"], amount=data["amount"])
                         obj.save()
-                        is_sup = is_supplier_user(request.user)
-
-                        if is_sup:
+                        if scope.is_supplier:
                             try:
-                                supplier_grocery = get_supplier_grocery_for_user(
-                                    request.user
-                                )
-                                if not supplier_grocery:
+                                if not scope.grocery_uid:
                                     messages.error(
                                         request, "No grocery assigned to supplier"
                                     )
                                     return redirect(request.path.replace("add/", ""))
-                                supplier_grocery.daily_incomes.connect(obj)
+                                rollups.attach_income(scope.grocery_uid, obj.uid)
                             except Exception:
                                 messages.error(
                                     request,
@@ -378,7 +471,7 @@ class Neo4jModelAdmin:
                             if grocery_id:
                                 try:
                                     grocery = Grocery.nodes.get(uid=grocery_id)
-                                    grocery.daily_incomes.connect(obj)
+                                    rollups.attach_income(grocery.uid, obj.uid)
                                 except Grocery.DoesNotExist:
                                     pass
                     else:
@@ -404,17 +497,9 @@ class Neo4jModelAdmin:
         return render(request, "admin/neo4j_form.html", context)
 
     def edit_view(self, request, object_id):
-        def is_supplier(u):
-            return is_supplier_user(u)
-
-        def is_admin(u):
-            return is_admin_user(u)
-
+        scope = admin_scope(request)
         model_name = self.model.__name__
-        if not (
-            is_admin(request.user)
-            or (is_supplier(request.user) and model_name in ["Item", "DailyIncome"])
-        ):
+        if not scope.can_manage(model_name):
             messages.error(request, "You don't have permission to edit records.")
             return redirect("/admin/")
 
@@ -447,6 +532,7 @@ class Neo4jModelAdmin:
                         if data.get("password"):
                             obj.set_password(data["password"])
                         obj.save()
+                        invalidate_user(obj.uid)
                         try:
                             if old_email != obj.email:
                                 deactivate_django_user_by_email(old_email)
@@ -463,6 +549,7 @@ class Neo4jModelAdmin:
                         if data.get("password"):
                             obj.set_password(data["password"])
                         obj.save()
+                        invalidate_user(obj.uid)
                         try:
                             if old_email != obj.email:
                                 deactivate_django_user_by_email(old_email)
@@ -474,14 +561,8 @@ class Neo4jModelAdmin:
                             )
                         grocery_id = data.get("grocery_id")
                         if grocery_id is not None:
-                            try:
-                                new_grocery = Grocery.nodes.get(uid=grocery_id)
-                                existing = obj.responsible_for.single()
-                                if existing:
-                                    obj.responsible_for.disconnect(existing)
-                                obj.responsible_for.connect(new_grocery)
-                            except Grocery.DoesNotExist:
-                                pass
+                            Supplier.assign_grocery(obj.uid, grocery_id)
+                            invalidate_user(obj.uid)
                     elif self.model.__name__ == "Item":
                         obj.name = data.get("name", obj.name)
                         obj.item_type = data.get("item_type", obj.item_type)
@@ -489,36 +570,43 @@ class Neo4jModelAdmin:
                         if data.get("price") is not None:
                             obj.price = data["price"]
                         obj.save()
-                        is_sup = is_supplier_user(request.user)
-                        if not is_sup:
+                        grocery_uid = scope.grocery_uid
+                        if not scope.is_supplier:
+                            current = obj.belongs_to_grocery.single()
+                            grocery_uid = current.uid if current else None
                             grocery_id = data.get("grocery_id")
                             if grocery_id:
                                 try:
-                                    current = obj.belongs_to_grocery.single()
-                                    if current and current.uid != grocery_id:
-                                        current.items.disconnect(obj)
                                     new_grocery = Grocery.nodes.get(uid=grocery_id)
-                                    new_grocery.items.connect(obj)
+                                    with atomic():
+                                        if current and current.uid != grocery_id:
+                                            rollups.detach_item(current.uid, obj.uid)
+                                        rollups.attach_item(new_grocery.uid, obj.uid)
                                 except Grocery.DoesNotExist:
                                     pass
+                        items_changed(grocery_uid, [obj.uid])
                     elif self.model.__name__ == "DailyIncome":
-                        if data.get("date"):
-                            obj.date = data["date"]
-                        if data.get("amount") is not None:
-                            obj.amount = data["amount"]
-                        obj.save()
-                        is_sup = is_supplier_user(request.user)
-                        if not is_sup:
+                        current = obj.grocery.single()
+                        target = current
+                        if not scope.is_supplier:
                             grocery_id = data.get("grocery_id")
                             if grocery_id:
                                 try:
-                                    current = obj.grocery.single()
-                                    if current and current.uid != grocery_id:
-                                        current.daily_incomes.disconnect(obj)
-                                    new_grocery = Grocery.nodes.get(uid=grocery_id)
-                                    new_grocery.daily_incomes.connect(obj)
+                                    target = Grocery.nodes.get(uid=grocery_id)
                                 except Grocery.DoesNotExist:
                                     pass
+                        # Retract the stored amount/date before they change,
+                        # then re-add the income to its (possibly new) grocery.
+                        with atomic():
+                            if current:
+                                rollups.detach_income(current.uid, obj.uid)
+                            if data.get("date"):
+                                obj.date = data["date"]
+                            if data.get("amount") is not None:
+                                obj.amount = data["amount"]
+                            obj.save()
+                            if target:
+                                rollups.attach_income(target.uid, obj.uid)
                     messages.success(
                         request, f"{self.model.__name__} updated successfully"
                     )
@@ -539,25 +627,9 @@ class Neo4jModelAdmin:
         return render(request, "admin/neo4j_form.html", context)
 
     def delete_view(self, request, object_id):
-        def is_supplier(u):
-            try:
-                from django.contrib.auth.models import Group
-
-                return (
-                    u.is_active
-                    and Group.objects.filter(user=u, name="Supplier").exists()
-                )
-            except Exception:
-                return False
-
-        def is_admin(u):
-            return u.is_active and (u.is_staff or u.is_superuser)
-
+        scope = admin_scope(request)
         model_name = self.model.__name__
-        if not (
-            is_admin(request.user)
-            or (is_supplier(request.user) and model_name in ["Item", "DailyIncome"])
-        ):
+        if not scope.can_manage(model_name):
             messages.error(request, "You don't have permission to delete records.")
             return redirect("/admin/")
 
@@ -570,6 +642,7 @@ class Neo4jModelAdmin:
                     obj.is_active = False
                     obj.save()
                 if self.model.__name__ in ["Supplier", "Admin"]:
+                    invalidate_user(obj.uid)
                     deactivate_django_user_by_email(obj.email)
             else:
                 messages.warning(request, "Delete action not supported for this model")
@@ -723,27 +796,10 @@ class CustomAdminSite(admin.AdminSite):
 
     def neo4j_stats_view(self, request):
         try:
-            admin_count = len(Neo4jAdmin.nodes.all())
-            supplier_count = len(Supplier.nodes.all())
-            grocery_count = len(Grocery.nodes.all())
-            item_count = len(Item.nodes.all())
-            income_count = len(DailyIncome.nodes.all())
-
-            stats = {
-                "Admins": admin_count,
-                "Suppliers": supplier_count,
-                "Groceries": grocery_count,
-                "Items": item_count,
-                "Daily Income Records": income_count,
-            }
-
-            # Print debug info
-            print(f"Neo4j Stats: {stats}")
-
             context = {
                 "title": "Neo4j Database Statistics",
-                "stats": stats,
-                "total_nodes": sum(stats.values()),
+                **stats.get(refresh="refresh" in request.GET),
+                "cache_timeout": stats.timeout(),
             }
             return render(request, "admin/neo4j_stats.html", context)
         except Exception as e:
@@ -761,16 +817,7 @@ class CustomAdminSite(admin.AdminSite):
             return redirect_to_login(request.get_full_path())
 
         extra_context = extra_context or {}
-        try:
-            from django.contrib.auth.models import Group
-
-            is_supplier = Group.objects.filter(
-                user=request.user, name="Supplier"
-            ).exists()
-        except Exception:
-            is_supplier = False
-
-        if is_supplier:
+        if admin_scope(request).is_supplier:
             menu = [
                 {"name": "Items", "url": "admin:neo4j_item_changelist"},
                 {"name": "Daily Income", "url": "admin:neo4j_dailyincome_changelist"},
@@ -1,72 +1,99 @@
-from typing import Optional, List
+from collections import namedtuple
+from typing import Optional
 
-from .models import Admin as Neo4jAdmin, Supplier, Grocery
+from neomodel import db
 
+from .cache import response_cache
+from .models import Admin as Neo4jAdmin, Supplier
 
-def is_supplier_user(user) -> bool:
-    try:
-        from django.contrib.auth.models import Group
 
-        return (
-            getattr(user, "is_active", False)
-            and Group.objects.filter(user=user, name="Supplier").exists()
-        )
-    except Exception:
-        return False
+SCOPE_SESSION_KEY = "neo4j_supplier_scope"
 
 
-def is_admin_user(user) -> bool:
-    try:
-        from django.contrib.auth.models import Group
+class AdminScope(namedtuple("AdminScope", "role supplier_uid grocery_uid")):
+    """Who is using the admin: ``role`` is ``"admin"``, ``"supplier"`` or
+    ``None``; suppliers also carry their node and grocery uids."""
 
-        in_supplier_group = Group.objects.filter(user=user, name="Supplier").exists()
-    except Exception:
-        in_supplier_group = False
-    return (
-        getattr(user, "is_active", False)
-        and (getattr(user, "is_staff", False) or getattr(user, "is_superuser", False))
-        and not in_supplier_group
-    )
+    @property
+    def is_admin(self):
+        return self.role == "admin"
+
+    @property
+    def is_supplier(self):
+        return self.role == "supplier"
+
+    def can_manage(self, model_name):
+        """Suppliers only manage their grocery's items and incomes."""
+        return self.is_admin or (
+            self.is_supplier and model_name in ["Item", "DailyIncome"]
+        )
 
 
 def get_login_email(user) -> Optional[str]:
     return getattr(user, "email", None) or getattr(user, "username", None)
 
 
-def get_supplier_grocery_for_user(user) -> Optional[Grocery]:
+def user_role(user) -> Optional[str]:
+    """Role of a Django user, with a single query for its groups."""
+    if not getattr(user, "is_active", False):
+        return None
     try:
-        login_email = get_login_email(user)
-        if not login_email:
-            return None
-        supplier_node = Supplier.nodes.get(email=login_email)
-        return supplier_node.responsible_for.single()
+        groups = set(user.groups.values_list("name", flat=True))
     except Exception:
-        return None
-
-
-def filter_objects_for_supplier(objects: List, model_name: str, user) -> List:
-    supplier_grocery = get_supplier_grocery_for_user(user)
-    if not supplier_grocery:
-        return []
-
-    filtered = []
-    if model_name == "Item":
-        for it in objects:
-            try:
-                g = it.belongs_to_grocery.single()
-                if g and g.uid == supplier_grocery.uid:
-                    filtered.append(it)
-            except Exception:
-                continue
-    elif model_name == "DailyIncome":
-        for inc in objects:
-            try:
-                g = inc.grocery.single()
-                if g and g.uid == supplier_grocery.uid:
-                    filtered.append(inc)
-            except Exception:
-                continue
-    return filtered
+        groups = set()
+    if "Supplier" in groups:
+        return "supplier"
+    if getattr(user, "is_staff", False) or getattr(user, "is_superuser", False):
+        return "admin"
+    return None
+
+
+def _supplier_uids(request):
+    """``(supplier_uid, grocery_uid)`` of the supplier logged in to the
+    admin. With a shared cache backend they are kept in the session until
+    the ``assignments`` version, which ``Supplier.assign_grocery`` bumps,
+    changes. A local-memory cache only sees the bumps of its own process, so
+    then they are looked up on every request instead.
+    """
+    email = get_login_email(request.user)
+    session = getattr(request, "session", None)
+    if not response_cache.shared:
+        session = None
+    if session is not None:
+        version = response_cache.versions(["assignments"])[0]
+        cached = session.get(SCOPE_SESSION_KEY)
+        if cached and cached["email"] == email and cached["version"] == version:
+            return cached["supplier_uid"], cached["grocery_uid"]
+
+    results, _ = db.cypher_query(
+        """
+        MATCH (s:Supplier {email: $email})
+        OPTIONAL MATCH (s)-[:RESPONSIBLE_FOR]->(g:Grocery)
+        RETURN s.uid, g.uid LIMIT 1
+        """,
+        {"email": email},
+    )
+    supplier_uid, grocery_uid = results[0] if results else (None, None)
+    if session is not None:
+        session[SCOPE_SESSION_KEY] = {
+            "email": email,
+            "version": version,
+            "supplier_uid": supplier_uid,
+            "grocery_uid": grocery_uid,
+        }
+    return supplier_uid, grocery_uid
+
+
+def admin_scope(request) -> AdminScope:
+    """The :class:`AdminScope` of the request's user, resolved at most once
+    per request."""
+    if not hasattr(request, "_admin_scope"):
+        role = user_role(request.user)
+        supplier_uid = grocery_uid = None
+        if role == "supplier":
+            supplier_uid, grocery_uid = _supplier_uids(request)
+        request._admin_scope = AdminScope(role, supplier_uid, grocery_uid)
+    return request._admin_scope
 
 
 def sync_django_user_for_admin(admin_node: Neo4jAdmin, raw_password: str) -> None:
@@ -125,4 +152,3 @@ def deactivate_django_user_by_email(email: str) -> None:
             django_user.save()
     except Exception:
         pass
-
@@ -1,41 +1,105 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from neomodel import db
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.tokens import RefreshToken
+from .cache import LRUCache, users_changed
 from .models import User
 
 
-class CustomJWTAuthentication(JWTAuthentication):
-    def get_user(self, validated_token):
+user_cache = LRUCache(
+    max_size=getattr(settings, "NEO4J_USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "NEO4J_USER_CACHE_TTL", 60),
+)
+
+
+def invalidate_user(uid):
+    """Drop cached state for a user after its profile, ``is_active`` or
+    grocery assignment changed."""
+    user_cache.delete(uid)
+    users_changed(uid)
+
+
+def supplier_grocery_uid(supplier_uid):
+    """Uid of the grocery a supplier is responsible for, or ``None``.
+
+    Deliberately not cached across requests: it decides what a supplier may
+    write, and a per-process cache would keep authorizing the old grocery in
+    every worker but the one that handled a reassignment.
+    """
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Supplier {uid: $uid})-[:RESPONSIBLE_FOR]->(g:Grocery)
+        RETURN g.uid LIMIT 1
+        """,
+        {"uid": supplier_uid},
+    )
+    return results[0][0] if results else None
+
+
+def get_supplier_grocery_uid(request):
+    """Grocery uid of the calling supplier, resolved at most once per request.
+
+    Returns ``None`` for admins and for suppliers without an assignment.
+    When token claims are trusted the signed ``grocery_uid`` claim is used.
+    """
+    if not hasattr(request, "_supplier_grocery_uid"):
+        grocery_uid = None
+        if getattr(request, "neo4j_user_type", None) == "supplier":
+            claims = request.auth or {}
+            if getattr(settings, "JWT_TRUST_USER_CLAIMS", False) and (
+                "grocery_uid" in claims
+            ):
+                grocery_uid = claims["grocery_uid"]
+            else:
+                grocery_uid = supplier_grocery_uid(request.user.pk)
+        request._supplier_grocery_uid = grocery_uid
+    return request._supplier_grocery_uid
+
+
+def resolve_user(uid):
+    neo4j_user = user_cache.get(uid)
+    if neo4j_user is None:
         try:
-            user_id = validated_token.get("user_id")
-            if not user_id:
-                raise InvalidToken(
-                    "Token contained no recognizable user identification"
-                )
+            neo4j_user = User.nodes.get(uid=uid)
+        except User.DoesNotExist:
+            raise InvalidToken("User not found")
+        user_cache.set(uid, neo4j_user)
+    return neo4j_user
 
-            try:
-                neo4j_user = User.nodes.get(uid=user_id)
 
-                class DjangoUserProxy:
-                    def __init__(self, neo4j_user):
-                        self.id = neo4j_user.uid
-                        self.is_authenticated = True
-                        self.is_active = neo4j_user.is_active
+class DjangoUserProxy:
+    def __init__(self, uid, is_active=True):
+        self.id = uid
+        self.is_authenticated = True
+        self.is_active = is_active
 
-                    @property
-                    def pk(self):
-                        return self.id
+    @property
+    def pk(self):
+        return self.id
 
-                django_user = DjangoUserProxy(neo4j_user)
 
-                return django_user, neo4j_user
+class CustomJWTAuthentication(JWTAuthentication):
+    """Authenticate a bearer token and expose the caller as
+    ``request.neo4j_user`` and ``request.neo4j_user_type``.
 
-            except User.DoesNotExist:
-                raise InvalidToken("User not found")
+    Users are resolved through a per-process TTL/LRU cache. With
+    ``JWT_TRUST_USER_CLAIMS`` enabled the role (and a supplier's
+    ``grocery_uid``) is taken from the verified claims and the node is only
+    loaded if a view touches ``request.neo4j_user``, at the price of role,
+    ``is_active`` and assignment changes taking effect only once the access
+    token expires.
+    """
 
-        except KeyError:
+    def get_user(self, validated_token):
+        user_id = validated_token.get("user_id")
+        if not user_id:
             raise InvalidToken("Token contained no recognizable user identification")
 
+        neo4j_user = resolve_user(user_id)
+        return DjangoUserProxy(neo4j_user.uid, neo4j_user.is_active), neo4j_user
+
     def authenticate(self, request):
         header = self.get_header(request)
         if header is None:
@@ -46,9 +110,22 @@ class CustomJWTAuthentication(JWTAuthentication):
             return None
 
         validated_token = self.get_validated_token(raw_token)
-        django_user, neo4j_user = self.get_user(validated_token)
+
+        user_type = validated_token.get("user_type")
+        if getattr(settings, "JWT_TRUST_USER_CLAIMS", False) and user_type:
+            user_id = validated_token.get("user_id")
+            if not user_id:
+                raise InvalidToken(
+                    "Token contained no recognizable user identification"
+                )
+            django_user = DjangoUserProxy(user_id)
+            neo4j_user = SimpleLazyObject(lambda: resolve_user(user_id))
+        else:
+            django_user, neo4j_user = self.get_user(validated_token)
+            user_type = neo4j_user.user_type
 
         request.neo4j_user = neo4j_user
+        request.neo4j_user_type = user_type
 
         return (django_user, validated_token)
 
@@ -64,6 +141,8 @@ def create_jwt_token(user):
     refresh["user_id"] = user.uid
     refresh["email"] = user.email
     refresh["user_type"] = user.user_type
+    if user.user_type == "supplier":
+        refresh["grocery_uid"] = supplier_grocery_uid(user.uid)
 
     return {
         "refresh": str(refresh),
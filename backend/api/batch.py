@@ -0,0 +1,173 @@
+"""Bulk item writes for ``POST /items/batch/``.
+
+Operations are validated in Python first, then executed in chunks of
+``CHUNK_SIZE``. Each chunk is its own transaction holding at most one
+``UNWIND $rows`` statement per kind of operation, so a 10k item import costs
+a few dozen round trips instead of tens of thousands. All statements are
+anchored on the batch's grocery, so updates and deletes can only reach items
+of that grocery, and they keep the counters of :mod:`api.rollups` in step.
+"""
+
+import time
+import uuid
+
+from neomodel import db
+
+from .cache import items_changed
+from .models import Item
+from .serializers import ItemSerializer
+from .transactions import atomic
+
+
+CHUNK_SIZE = 500
+MAX_OPERATIONS = 10000
+OPERATIONS = ("create", "update", "delete")
+STATUSES = {"create": "created", "update": "updated", "delete": "deleted"}
+
+ITEM_LABELS = ":".join(Item.inherited_labels())
+
+
+def validate_operations(operations):
+    """Split raw operations into executable rows and per-row failures.
+
+    Returns ``(valid, results)`` where ``valid`` is a list of
+    ``(index, op, row)`` and ``results`` maps the index of every rejected
+    operation to its result.
+    """
+    valid = []
+    results = {}
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            results[index] = _failure(
+                index, None, {"non_field_errors": ["Expected an object"]}
+            )
+            continue
+
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            results[index] = _failure(
+                index, op, {"op": [f"Must be one of: {', '.join(OPERATIONS)}"]}
+            )
+            continue
+
+        uid = operation.get("uid")
+        if op != "create" and not uid:
+            results[index] = _failure(index, op, {"uid": ["This field is required."]})
+            continue
+
+        if op == "delete":
+            valid.append((index, op, {"uid": uid}))
+            continue
+
+        serializer = ItemSerializer(data=operation, partial=op == "update")
+        if not serializer.is_valid():
+            results[index] = _failure(index, op, serializer.errors, uid)
+            continue
+
+        row = dict(serializer.validated_data)
+        if op == "create":
+            valid.append((index, op, {"uid": uuid.uuid4().hex, "props": row}))
+        else:
+            valid.append((index, op, {"uid": uid, "props": row}))
+    return valid, results
+
+
+def execute(grocery_uid, valid, supplier_uid=None, chunk_size=CHUNK_SIZE):
+    """Run validated operations against one grocery.
+
+    Within a chunk, creates run before updates and updates before deletes.
+    Returns a dict mapping operation index to its result.
+    """
+    results = {}
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start : start + chunk_size]
+        by_op = {op: [] for op in OPERATIONS}
+        for index, op, row in chunk:
+            by_op[op].append((index, row))
+
+        with atomic():
+            done = set()
+            if by_op["create"]:
+                done |= _create(
+                    grocery_uid, [row for _, row in by_op["create"]], supplier_uid
+                )
+            if by_op["update"]:
+                done |= _update(grocery_uid, [row for _, row in by_op["update"]])
+            if by_op["delete"]:
+                done |= _delete(grocery_uid, [row["uid"] for _, row in by_op["delete"]])
+            if done:
+                items_changed(grocery_uid, [uid for _, uid in done])
+
+        for index, op, row in chunk:
+            status = STATUSES[op] if (op, row["uid"]) in done else "not_found"
+            results[index] = {
+                "index": index,
+                "op": op,
+                "status": status,
+                "uid": row["uid"],
+            }
+    return results
+
+
+def _failure(index, op, errors, uid=None):
+    return {"index": index, "op": op, "status": "invalid", "uid": uid, "errors": errors}
+
+
+def _create(grocery_uid, rows, supplier_uid):
+    results, _ = db.cypher_query(
+        f"""
+        MATCH (g:Grocery {{uid: $grocery_uid}})
+        OPTIONAL MATCH (s:Supplier {{uid: $supplier_uid}})
+        UNWIND $rows AS row
+        CREATE (g)-[:HAS_ITEM]->(i:{ITEM_LABELS})
+        SET i = row.props, i.uid = row.uid, i.is_deleted = false,
+            i.created_at = $now, i.updated_at = $now
+        FOREACH (_ IN CASE WHEN s IS NULL THEN [] ELSE [1] END |
+            CREATE (s)-[:ADDED_ITEM]->(i))
+        WITH g, collect(i.uid) AS created
+        SET g.active_items_count = g.active_items_count + size(created)
+        RETURN created
+        """,
+        {
+            "grocery_uid": grocery_uid,
+            "supplier_uid": supplier_uid,
+            "rows": rows,
+            "now": time.time(),
+        },
+    )
+    return {("create", uid) for uid in (results[0][0] if results else [])}
+
+
+def _update(grocery_uid, rows):
+    results, _ = db.cypher_query(
+        """
+        UNWIND $rows AS row
+        MATCH (:Grocery {uid: $grocery_uid})-[:HAS_ITEM]->(i:Item {uid: row.uid})
+        WHERE i.is_deleted = false
+        SET i += row.props, i.updated_at = $now
+        RETURN DISTINCT i.uid
+        """,
+        {"grocery_uid": grocery_uid, "rows": rows, "now": time.time()},
+    )
+    return {("update", row[0]) for row in results}
+
+
+def _delete(grocery_uid, uids):
+    results, _ = db.cypher_query(
+        """
+        MATCH (g:Grocery {uid: $grocery_uid})
+        UNWIND $uids AS uid
+        MATCH (g)-[:HAS_ITEM]->(i:Item {uid: uid})
+        WHERE i.is_deleted = false
+        SET i.is_deleted = true, i.updated_at = $now
+        WITH g, collect(i.uid) AS deleted
+        SET g.active_items_count = g.active_items_count - size(deleted)
+        RETURN deleted
+        """,
+        {
+            "grocery_uid": grocery_uid,
+            "uids": list(dict.fromkeys(uids)),
+            "now": time.time(),
+        },
+    )
+    return {("delete", uid) for uid in (results[0][0] if results else [])}
@@ -0,0 +1,254 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+
+from .transactions import on_commit
+
+
+class LRUCache:
+    """A small thread-safe, per-process LRU cache with a time-to-live.
+
+    Entries expire ``ttl`` seconds after they were stored, so values cached
+    by one worker go stale for at most that long when another worker
+    changes them.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ResponseCache:
+    """Read-through cache of serialized API responses on Django's cache
+    framework.
+
+    Each cached read declares the version *scopes* its output depends on,
+    e.g. ``"groceries"`` or ``"grocery:<uid>"``. Entries are keyed by the
+    endpoint, the request URL, a caller-specific ``vary`` value and the
+    current version of every scope. Writes call :meth:`bump` to replace the
+    versions they affect, which makes the old entries unreachable. Bumps are
+    deferred until the surrounding ``atomic()`` block commits, so a reader
+    cannot cache pre-commit data under a post-commit version.
+
+    A version starts with the time it was created, so the versions of a
+    read also say when it last changed (see :meth:`changed_at`).
+
+    Invalidation only reaches other worker processes through a shared cache
+    backend (see ``CACHES`` in settings).
+    """
+
+    prefix = "api"
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return getattr(settings, "API_CACHE_ENABLED", True)
+
+    @property
+    def shared(self):
+        """Whether every worker process sees the same versions, i.e. the
+        backend is not a per-process local-memory (or dummy) cache."""
+        return not isinstance(self.cache, (LocMemCache, DummyCache))
+
+    def _version_key(self, scope):
+        return f"{self.prefix}:v:{scope}"
+
+    @staticmethod
+    def _new_version():
+        return f"{time.time():.6f}:{uuid.uuid4().hex}"
+
+    @staticmethod
+    def changed_at(versions):
+        """Epoch seconds of the newest of ``versions``, or ``None``."""
+        stamps = []
+        for version in versions:
+            try:
+                stamps.append(float(version.split(":", 1)[0]))
+            except ValueError:
+                continue
+        return max(stamps) if stamps else None
+
+    def versions(self, scopes):
+        keys = [self._version_key(scope) for scope in scopes]
+        found = self.cache.get_many(keys)
+        versions = []
+        for key in keys:
+            version = found.get(key)
+            if version is None:
+                # add() keeps a version another worker set in the meantime
+                self.cache.add(key, self._new_version(), timeout=None)
+                version = self.cache.get(key)
+            versions.append(version)
+        return versions
+
+    def bump(self, *scopes):
+        """Invalidate every entry depending on any of ``scopes``."""
+        if not scopes:
+            return
+
+        def replace():
+            self.cache.set_many(
+                {self._version_key(scope): self._new_version() for scope in scopes},
+                timeout=None,
+            )
+
+        on_commit(replace)
+
+    def respond(self, request, endpoint, scopes, build, vary="", versions=None):
+        """Return the cached response data for this request, or call
+        ``build()`` and cache its data if it is a 200 response.
+
+        ``versions`` may pass in the scopes' versions if the caller already
+        read them.
+        """
+        if not self.enabled:
+            return build()
+
+        if versions is None:
+            versions = self.versions(scopes)
+        digest = hashlib.sha1(
+            "\n".join([request.build_absolute_uri(), str(vary), *versions]).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+        key = f"{self.prefix}:r:{endpoint}:{digest}"
+
+        data = self.cache.get(key)
+        if data is not None:
+            self._count(endpoint, "hits")
+            return Response(data)
+
+        self._count(endpoint, "misses")
+        response = build()
+        if response.status_code == 200:
+            self.cache.set(
+                key, response.data, timeout=getattr(settings, "API_CACHE_TIMEOUT", 300)
+            )
+        return response
+
+    def _count(self, endpoint, outcome):
+        key = f"{self.prefix}:stats:{endpoint}:{outcome}"
+        if not self.cache.add(key, 1, timeout=None):
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, 1, timeout=None)
+
+    def stats(self, endpoints):
+        keys = [
+            f"{self.prefix}:stats:{endpoint}:{outcome}"
+            for endpoint in endpoints
+            for outcome in ("hits", "misses")
+        ]
+        found = self.cache.get_many(keys)
+
+        def ratio(hits, misses):
+            return round(hits / (hits + misses), 4) if hits + misses else None
+
+        result = {}
+        for endpoint in endpoints:
+            hits = found.get(f"{self.prefix}:stats:{endpoint}:hits", 0)
+            misses = found.get(f"{self.prefix}:stats:{endpoint}:misses", 0)
+            result[endpoint] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": ratio(hits, misses),
+            }
+        hits = sum(row["hits"] for row in result.values())
+        misses = sum(row["misses"] for row in result.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": ratio(hits, misses),
+            "endpoints": result,
+        }
+
+
+response_cache = ResponseCache()
+
+# Endpoints served through response_cache, as named in their respond() calls
+CACHED_ENDPOINTS = (
+    "grocery-list",
+    "grocery-detail",
+    "item-list",
+    "item-detail",
+    "user-detail",
+)
+
+
+def groceries_changed(*grocery_uids):
+    response_cache.bump("groceries", *(f"grocery:{uid}" for uid in grocery_uids))
+
+
+def items_changed(grocery_uid=None, item_uids=()):
+    scopes = ["items", *(f"item:{uid}" for uid in item_uids)]
+    if grocery_uid:
+        scopes += [f"items:{grocery_uid}", f"grocery:{grocery_uid}"]
+    response_cache.bump(*scopes)
+
+
+def totals_changed(*grocery_uids):
+    response_cache.bump(*(f"grocery:{uid}" for uid in grocery_uids))
+
+
+def incomes_changed(*grocery_uids):
+    """Incomes of these groceries were added, changed or removed, and with
+    them their totals."""
+    response_cache.bump(
+        "incomes",
+        *(f"incomes:{uid}" for uid in grocery_uids),
+        *(f"grocery:{uid}" for uid in grocery_uids),
+    )
+
+
+def users_changed(*user_uids):
+    response_cache.bump("users", *(f"user:{uid}" for uid in user_uids))
+
+
+def assignments_changed():
+    response_cache.bump("assignments")
@@ -0,0 +1,156 @@
+"""Declared Neo4j indexes.
+
+``install_labels`` only creates what the neomodel classes declare: uniqueness
+constraints and ``index=True`` properties. ``INDEXES`` adds the indexes for
+the predicates the API filters on. ``manage.py sync_indexes`` compares both
+sets against ``SHOW INDEXES``, creates what is missing and reports the rest.
+
+Indexes are compared by schema (kind, label, properties), not by name, so an
+index created by hand or by ``install_labels`` under another name counts.
+"""
+
+from collections import namedtuple
+
+from neomodel import db
+
+from .models import Admin, DailyIncome, DailyTotal, Grocery, Item, Supplier, User
+
+
+KINDS = ("RANGE", "TEXT", "POINT", "FULLTEXT")
+
+# ``properties`` is a tuple; more than one makes a composite RANGE index, or a
+# FULLTEXT index over several properties.
+Index = namedtuple("Index", "name kind label properties")
+
+INDEXES = (
+    Index("grocery_is_active", "RANGE", "Grocery", ("is_active",)),
+    Index("user_user_type", "RANGE", "User", ("user_type",)),
+    # Live items in the default created_at order of the item list; also
+    # serves is_deleted alone, as its leading property
+    Index("item_is_deleted_created_at", "RANGE", "Item", ("is_deleted", "created_at")),
+    # Item list filters and orderings (api.filters.ITEM_FILTERS)
+    Index("item_item_type", "RANGE", "Item", ("item_type",)),
+    Index("item_item_location", "RANGE", "Item", ("item_location",)),
+    Index("item_name", "RANGE", "Item", ("name",)),
+    Index("item_price", "RANGE", "Item", ("price",)),
+    Index("item_created_at", "RANGE", "Item", ("created_at",)),
+    # Day-window reads of api.rollups.daily_totals
+    Index("daily_total_day", "RANGE", "DailyTotal", ("day",)),
+    # Used by api.search
+    Index("item_search", "FULLTEXT", "Item", ("name", "item_type", "item_location")),
+    Index("grocery_search", "FULLTEXT", "Grocery", ("name", "location")),
+    Index("user_search", "FULLTEXT", "User", ("name", "email")),
+)
+
+MODELS = (User, Admin, Supplier, Grocery, Item, DailyIncome, DailyTotal)
+
+
+def schema(index):
+    return index.kind, index.label, tuple(index.properties)
+
+
+def model_indexes():
+    """The RANGE indexes ``install_labels`` creates for ``index=True``."""
+    for cls in MODELS:
+        for name, prop in cls.defined_properties(aliases=False, rels=False).items():
+            if prop.index:
+                yield Index(
+                    f"index_{cls.__label__}_{name}",
+                    "RANGE",
+                    cls.__label__,
+                    (prop.db_property or name,),
+                )
+
+
+def declared():
+    indexes = {}
+    for index in (*model_indexes(), *INDEXES):
+        indexes.setdefault(schema(index), index)
+    return list(indexes.values())
+
+
+def existing():
+    """Node indexes from ``SHOW INDEXES``, except token lookup indexes."""
+    results, columns = db.cypher_query(
+        """
+        SHOW INDEXES
+        YIELD name, type, entityType, labelsOrTypes, properties, state,
+              populationPercent, owningConstraint, readCount
+        WHERE entityType = 'NODE' AND type <> 'LOOKUP'
+        RETURN *
+        """
+    )
+    rows = [dict(zip(columns, row)) for row in results]
+    for row in rows:
+        row["schema"] = (
+            row["type"],
+            ",".join(row["labelsOrTypes"]),
+            tuple(row["properties"]),
+        )
+    return rows
+
+
+def create_statement(index):
+    if index.kind not in KINDS:
+        raise ValueError(f"Unknown index kind {index.kind!r} for {index.name}")
+    props = ", ".join(f"n.{prop}" for prop in index.properties)
+    target = f"ON EACH [{props}]" if index.kind == "FULLTEXT" else f"ON ({props})"
+    return (
+        f"CREATE {index.kind} INDEX {index.name} IF NOT EXISTS "
+        f"FOR (n:{index.label}) {target}"
+    )
+
+
+def create(index):
+    # Index creation never blocks writes; the index populates in the
+    # background and is used once it is ONLINE.
+    db.cypher_query(create_statement(index))
+
+
+def await_online(names, timeout):
+    for name in names:
+        db.cypher_query(
+            "CALL db.awaitIndex($name, $timeout)", {"name": name, "timeout": timeout}
+        )
+
+
+def diff():
+    """Compare declared indexes with the database.
+
+    Returns a dict with ``missing`` (declared ``Index`` tuples), and
+    ``undeclared``, ``redundant`` and ``unused`` (``SHOW INDEXES`` rows).
+    Redundant indexes duplicate another index's schema or are a RANGE index
+    whose properties are a leading prefix of a composite one on the same
+    label. Indexes backing a constraint are left out of all three reports.
+    """
+    wanted = declared()
+    rows = existing()
+    present = {row["schema"] for row in rows}
+    wanted_schemas = {schema(index) for index in wanted}
+    free = [row for row in rows if not row["owningConstraint"]]
+
+    redundant = []
+    seen = set()
+    # Constraint-backed indexes first, so a plain index duplicating one is
+    # the one reported.
+    for row in sorted(rows, key=lambda row: not row["owningConstraint"]):
+        kind, label, props = row["schema"]
+        duplicate = row["schema"] in seen
+        seen.add(row["schema"])
+        if row["owningConstraint"]:
+            continue
+        prefix = kind == "RANGE" and any(
+            other["schema"][:2] == (kind, label)
+            and len(other["schema"][2]) > len(props)
+            and other["schema"][2][: len(props)] == props
+            for other in rows
+        )
+        if duplicate or prefix:
+            redundant.append(row)
+
+    return {
+        "missing": [index for index in wanted if schema(index) not in present],
+        "undeclared": [row for row in free if row["schema"] not in wanted_schemas],
+        "redundant": redundant,
+        "unused": [row for row in free if not row["readCount"]],
+    }
@@ -3,6 +3,7 @@ Management command to create sample data for testing.
 """
 
 from django.core.management.base import BaseCommand
+from api import rollups
 from api.models import Admin, Supplier, Grocery, Item, DailyIncome
 from datetime import datetime, timedelta
 
@@ -109,7 +110,7 @@ class Command(BaseCommand):
                 item.save()
 
                 # Connect relationships
-                item_data["grocery"].items.connect(item)
+                rollups.attach_item(item_data["grocery"].uid, item.uid)
                 item_data["supplier"].added_items.connect(item)
 
                 self.stdout.write(f"Created item: {item.name}")
@@ -122,7 +123,7 @@ class Command(BaseCommand):
                 income1.date = base_date + timedelta(days=i)
                 income1.amount = 150.0 + (i * 20)
                 income1.save()
-                grocery1.daily_incomes.connect(income1)
+                rollups.attach_income(grocery1.uid, income1.uid)
                 supplier1.recorded_incomes.connect(income1)
 
                 # Income for grocery2
@@ -130,7 +131,7 @@ class Command(BaseCommand):
                 income2.date = base_date + timedelta(days=i)
                 income2.amount = 200.0 + (i * 15)
                 income2.save()
-                grocery2.daily_incomes.connect(income2)
+                rollups.attach_income(grocery2.uid, income2.uid)
                 supplier2.recorded_incomes.connect(income2)
 
             self.stdout.write("Created sample daily income records")
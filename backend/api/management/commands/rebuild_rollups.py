@@ -0,0 +1,79 @@
+"""
+Management command to recompute materialized grocery counters and day totals.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute grocery item/income counters and daily totals, reporting drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of groceries recomputed per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drift, do not write anything",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        self.stdout.write("Checking grocery rollups...")
+
+        checked = drifted = 0
+        after = ""
+        try:
+            while True:
+                batch = rollups.inspect_groceries(after, batch_size)
+                if not batch:
+                    break
+                after = batch[-1]["uid"]
+                checked += len(batch)
+
+                stale = [row for row in batch if self._report_drift(row)]
+                drifted += len(stale)
+
+                if not dry_run:
+                    # Rebuild the whole batch: it also materializes groceries
+                    # whose counters were never initialized.
+                    rollups.rebuild_groceries(row["uid"] for row in batch)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error rebuilding rollups: {str(e)}"))
+            return
+
+        summary = f"Checked {checked} groceries, {drifted} with drift"
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"{summary} (dry run)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}; rollups rebuilt"))
+
+    def _report_drift(self, row):
+        problems = []
+        if row["stored_items"] is None or row["stored_income"] is None:
+            problems.append("not materialized")
+        else:
+            if row["stored_items"] != row["items"]:
+                problems.append(f"items {row['stored_items']} != {row['items']}")
+            if abs(row["stored_income"] - row["income"]) > 1e-6:
+                problems.append(f"income {row['stored_income']} != {row['income']}")
+            if row["drifted_days"] or row["stored_days"] != row["days"]:
+                problems.append(
+                    f"{row['drifted_days']} stale day totals, "
+                    f"{row['stored_days']} stored for {row['days']} days"
+                )
+
+        if problems:
+            self.stdout.write(
+                self.style.WARNING(f"  {row['name']} ({row['uid']}): ")
+                + "; ".join(problems)
+            )
+        return bool(problems)
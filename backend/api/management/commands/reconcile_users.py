@@ -0,0 +1,74 @@
+"""
+Management command to reconcile Django admin users with Neo4j users.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api import reconcile
+
+
+class Command(BaseCommand):
+    help = "Create, update and deactivate Django users to match Neo4j users"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of users read from each store per batch",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the changes, do not write anything",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        # -v 2 lists every user that is changed
+        self.list_users = options["verbosity"] > 1
+
+        self.stdout.write("Reconciling Django users with Neo4j users...")
+
+        checked = created = updated = deactivated = 0
+        try:
+            groups = reconcile.role_groups()
+
+            after = ""
+            while True:
+                nodes = reconcile.neo4j_users(after, batch_size)
+                if not nodes:
+                    break
+                after = nodes[-1]["email"]
+                checked += len(nodes)
+                new, changed = reconcile.sync_batch(nodes, groups, dry_run)
+                created += len(new)
+                updated += len(changed)
+                self._list("create", new)
+                self._list("update", changed)
+
+            after_id = 0
+            while after_id is not None:
+                after_id, orphans = reconcile.deactivate_orphans(
+                    after_id, batch_size, groups, dry_run
+                )
+                deactivated += len(orphans)
+                self._list("deactivate", orphans)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error reconciling users: {str(e)}"))
+            return
+
+        summary = (
+            f"Checked {checked} Neo4j users: {created} created, {updated} updated, "
+            f"{deactivated} deactivated"
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"{summary} (dry run)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+    def _list(self, action, usernames):
+        if self.list_users:
+            for username in usernames:
+                self.stdout.write(f"  {action}: {username}")
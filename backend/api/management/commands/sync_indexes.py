@@ -0,0 +1,74 @@
+"""
+Management command to create declared Neo4j indexes and report stray ones.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api import indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Create missing indexes from api.indexes and report undeclared, "
+        "redundant and unused ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report differences, do not create anything",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=300,
+            help="Seconds to wait for each new index to come online",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Comparing declared indexes with SHOW INDEXES...")
+        try:
+            report = indexes.diff()
+
+            for index in report["missing"]:
+                self.stdout.write(
+                    self.style.WARNING(f"  missing: {self._describe(index)}")
+                )
+            if report["missing"] and not options["dry_run"]:
+                for index in report["missing"]:
+                    indexes.create(index)
+                self.stdout.write("Waiting for new indexes to come online...")
+                indexes.await_online(
+                    [index.name for index in report["missing"]], options["timeout"]
+                )
+
+            for key in ("undeclared", "redundant", "unused"):
+                for row in report[key]:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"  {key}: {row['name']} "
+                            f"({row['type']} {row['schema'][1]}"
+                            f"({', '.join(row['properties'])}), {row['state']})"
+                        )
+                    )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error syncing indexes: {str(e)}"))
+            return
+
+        summary = (
+            f"{len(report['missing'])} missing, {len(report['undeclared'])} "
+            f"undeclared, {len(report['redundant'])} redundant, "
+            f"{len(report['unused'])} unused"
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{summary} (dry run)"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{summary}; missing indexes created and online")
+            )
+
+    def _describe(self, index):
+        return (
+            f"{index.name} ({index.kind} {index.label}({', '.join(index.properties)}))"
+        )
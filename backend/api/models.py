@@ -1,4 +1,5 @@
 from neomodel import (
+    db,
     StructuredNode,
     StringProperty,
     DateTimeProperty,
@@ -8,19 +9,26 @@ from neomodel import (
     BooleanProperty,
     UniqueIdProperty,
     EmailProperty,
+    IntegerProperty,
     ZeroOrOne,
 )
 from django.contrib.auth.hashers import make_password, check_password
-from datetime import datetime
+from datetime import datetime, timezone
+import time
+
+from . import rollups
+from .cache import assignments_changed, groceries_changed, users_changed
+from .transactions import atomic
 
 
 class BaseNode(StructuredNode):
     uid = UniqueIdProperty()
     created_at = DateTimeProperty(default_now=True)
-    updated_at = DateTimeProperty(default_now=True)
+    # Range-indexed for the /sync/ feed (see api.sync)
+    updated_at = DateTimeProperty(default_now=True, index=True)
 
     def save(self):
-        self.updated_at = datetime.now()
+        self.updated_at = datetime.now(timezone.utc)
         super().save()
 
     class Meta:
@@ -42,6 +50,10 @@ class User(BaseNode):
     def check_password(self, raw_password):
         return check_password(raw_password, self.password)
 
+    def post_save(self):
+        # Names of users are rendered by grocery, item and income reads
+        users_changed(self.uid)
+
     def __str__(self):
         return f"{self.name} ({self.email})"
 
@@ -65,6 +77,39 @@ class Supplier(User):
         self.user_type = "supplier"
         super().save()
 
+    @classmethod
+    def assign_grocery(cls, supplier_uid, grocery_uid, active_only=False):
+        """Make a supplier responsible for a grocery, replacing any previous
+        assignment in a single statement.
+
+        Touching ``updated_at`` first write-locks the supplier, so concurrent
+        reassignments cannot both see "no assignment" and leave two behind.
+        Returns ``False`` if the supplier or grocery does not exist (or is
+        inactive, with ``active_only``).
+        """
+        where = "WHERE s.is_active AND g.is_active" if active_only else ""
+        results, _ = db.cypher_query(
+            f"""
+            MATCH (s:Supplier {{uid: $supplier_uid}}), (g:Grocery {{uid: $grocery_uid}})
+            {where}
+            SET s.updated_at = $now
+            WITH s, g
+            OPTIONAL MATCH (s)-[old:RESPONSIBLE_FOR]->(:Grocery)
+            WITH s, g, collect(old) AS old
+            FOREACH (r IN old | DELETE r)
+            CREATE (s)-[:RESPONSIBLE_FOR]->(g)
+            RETURN s.uid
+            """,
+            {
+                "supplier_uid": supplier_uid,
+                "grocery_uid": grocery_uid,
+                "now": time.time(),
+            },
+        )
+        if results:
+            assignments_changed()
+        return bool(results)
+
 
 class Grocery(BaseNode):
     name = StringProperty(required=True)
@@ -75,6 +120,16 @@ class Grocery(BaseNode):
     supplier = RelationshipFrom("Supplier", "RESPONSIBLE_FOR", cardinality=ZeroOrOne)
     items = RelationshipTo("Item", "HAS_ITEM")
     daily_incomes = RelationshipTo("DailyIncome", "HAS_INCOME")
+    day_totals = RelationshipTo("DailyTotal", "HAS_DAY_TOTAL")
+
+    # active_items_count and income_total are maintained by api.rollups and
+    # intentionally not declared here, so save() never writes them.
+
+    def post_create(self):
+        rollups.initialize_grocery(self.uid)
+
+    def post_save(self):
+        groceries_changed(self.uid)
 
     def __str__(self):
         return f"{self.name} - {self.location}"
@@ -91,19 +146,25 @@ class Item(BaseNode):
     added_by = RelationshipFrom("Supplier", "ADDED_ITEM")
 
     def soft_delete(self):
-        self.is_deleted = True
-        self.save()
+        self._set_deleted(True)
 
     def restore(self):
-        self.is_deleted = False
-        self.save()
+        self._set_deleted(False)
+
+    def _set_deleted(self, deleted):
+        with atomic():
+            changed = self.is_deleted != deleted
+            self.is_deleted = deleted
+            self.save()
+            if changed:
+                rollups.adjust_item_count_for_item(self.uid, -1 if deleted else 1)
 
     def __str__(self):
         return f"{self.name} - {self.item_type} - ${self.price}"
 
 
 class DailyIncome(BaseNode):
-    date = DateTimeProperty(required=True)
+    date = DateTimeProperty(required=True, index=True)
     amount = FloatProperty(required=True)
 
     grocery = RelationshipFrom("Grocery", "HAS_INCOME")
@@ -111,3 +172,16 @@ class DailyIncome(BaseNode):
 
     def __str__(self):
         return f"Income: ${self.amount} on {self.date}"
+
+
+class DailyTotal(StructuredNode):
+    """Materialized income for one grocery and UTC day, see api.rollups."""
+
+    day = StringProperty(required=True)
+    total = FloatProperty(default=0.0)
+    count = IntegerProperty(default=0)
+
+    grocery = RelationshipFrom("Grocery", "HAS_DAY_TOTAL")
+
+    def __str__(self):
+        return f"Total: ${self.total} on {self.day}"
@@ -0,0 +1,117 @@
+import base64
+import binascii
+import json
+
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CypherCursorPagination:
+    """Keyset pagination over a :class:`~api.queries.NodeQuery`.
+
+    Rows are ordered by ``(created_at, uid)``, or another ``(property, uid)``
+    pair, and each page resumes strictly after the last key of the previous
+    one, so the cost of a page does not grow with its depth the way ``SKIP``
+    does.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii"))
+            key, uid = json.loads(raw.decode("utf-8"))
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if isinstance(key, bool) or not isinstance(key, (int, float, str)):
+            raise NotFound(self.invalid_cursor_message)
+        return key, str(uid)
+
+    def encode_cursor(self, key, uid):
+        raw = json.dumps([key, uid], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def paginate_query(self, query, request, ordering=("created_at", False)):
+        """One page of ``query`` ordered by ``ordering``, a ``(property,
+        descending)`` pair; ties, and rows with equal keys, go by uid."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        alias = query.alias
+        prop, descending = ordering
+        key = f"{alias}.{prop}"
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            query = query.filter(
+                f"{key} {'<' if descending else '>'} $cursor_key OR "
+                f"({key} = $cursor_key AND {alias}.uid > $cursor_uid)",
+                cursor_key=cursor[0],
+                cursor_uid=cursor[1],
+            )
+        query = query.project(cursor_key=key)
+
+        nodes = query.fetch(
+            order_by=[f"{key} DESC" if descending else key, f"{alias}.uid"],
+            limit=page_size + 1,
+        )
+        page = nodes[:page_size]
+
+        self.next_cursor = None
+        if len(nodes) > page_size:
+            last = page[-1]
+            # nodes carry projections in .prefetched, records as attributes
+            prefetched = getattr(last, "prefetched", None)
+            if prefetched is not None:
+                last_key = prefetched["cursor_key"]
+            else:
+                last_key = last.cursor_key
+            self.next_cursor = self.encode_cursor(last_key, last.uid)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_keyed_response(self, request, data, next_key):
+        """Response for a page the caller fetched on its own ``(key, uid)``
+        ordering; ``next_key`` is ``None`` on the last page."""
+        self.request = request
+        self.next_cursor = self.encode_cursor(*next_key) if next_key else None
+        return self.get_paginated_response(data)
+
+
+class StandardResultsSetPagination(CypherCursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class SyncPagination(CypherCursorPagination):
+    """Page size and ``?since=`` cursor of the ``/sync/`` feed, which is
+    keyed on ``(updated_at, uid)`` instead."""
+
+    page_size = 500
+    max_page_size = 1000
+    cursor_query_param = "since"
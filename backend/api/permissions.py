@@ -1,34 +1,45 @@
 from rest_framework.permissions import BasePermission
+from .authentication import get_supplier_grocery_uid
 from .models import Admin, Supplier
 
 
+def get_user_type(request):
+    """Role of the authenticated caller, as resolved by
+    CustomJWTAuthentication. Reading it never loads the user node."""
+    if not request.user or not hasattr(request, "neo4j_user"):
+        return None
+    return getattr(request, "neo4j_user_type", None)
+
+
+def object_grocery_uid(obj):
+    """Uid of the grocery an item or income belongs to, preferring a
+    ``grocery_uid`` projected alongside the node."""
+    prefetched = getattr(obj, "prefetched", {})
+    if "grocery_uid" in prefetched:
+        return prefetched["grocery_uid"]
+    rel = obj.belongs_to_grocery if hasattr(obj, "belongs_to_grocery") else obj.grocery
+    grocery = rel.single()
+    return grocery.uid if grocery else None
+
+
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        if not request.user or not hasattr(request, "neo4j_user"):
-            return False
-        return isinstance(request.neo4j_user, Admin)
+        return get_user_type(request) == "admin"
 
 
 class IsSupplier(BasePermission):
     def has_permission(self, request, view):
-        if not request.user or not hasattr(request, "neo4j_user"):
-            return False
-        return isinstance(request.neo4j_user, Supplier)
+        return get_user_type(request) == "supplier"
 
 
 class IsAdminOrSupplier(BasePermission):
     def has_permission(self, request, view):
-        if not request.user or not hasattr(request, "neo4j_user"):
-            return False
-        neo4j_user = request.neo4j_user
-        return isinstance(neo4j_user, (Admin, Supplier))
+        return get_user_type(request) in ("admin", "supplier")
 
 
 class IsSupplierOwnerOrAdmin(BasePermission):
     def has_permission(self, request, view):
-        if not request.user or not hasattr(request, "neo4j_user"):
-            return False
-        return isinstance(request.neo4j_user, (Admin, Supplier))
+        return get_user_type(request) in ("admin", "supplier")
 
     def has_object_permission(self, request, view, obj):
         neo4j_user = request.neo4j_user
@@ -38,18 +49,14 @@ class IsSupplierOwnerOrAdmin(BasePermission):
 
         if isinstance(neo4j_user, Supplier):
             try:
-                supplier_grocery = neo4j_user.responsible_for.single()
-                if not supplier_grocery:
+                supplier_grocery_uid = get_supplier_grocery_uid(request)
+                if not supplier_grocery_uid:
                     return False
 
-                if hasattr(obj, "belongs_to_grocery"):
-                    item_grocery = obj.belongs_to_grocery.single()
-                    return item_grocery and item_grocery.uid == supplier_grocery.uid
-                elif hasattr(obj, "grocery"):
-                    income_grocery = obj.grocery.single()
-                    return income_grocery and income_grocery.uid == supplier_grocery.uid
+                if hasattr(obj, "belongs_to_grocery") or hasattr(obj, "grocery"):
+                    return object_grocery_uid(obj) == supplier_grocery_uid
                 elif hasattr(obj, "uid"):
-                    return obj.uid == supplier_grocery.uid
+                    return obj.uid == supplier_grocery_uid
 
             except Exception:
                 return False
@@ -59,9 +66,7 @@ class IsSupplierOwnerOrAdmin(BasePermission):
 
 class CanReadItems(BasePermission):
     def has_permission(self, request, view):
-        if not request.user or not hasattr(request, "neo4j_user"):
-            return False
-        return isinstance(request.neo4j_user, (Admin, Supplier))
+        return get_user_type(request) in ("admin", "supplier")
 
     def has_object_permission(self, request, view, obj):
         neo4j_user = request.neo4j_user
@@ -74,13 +79,12 @@ class CanReadItems(BasePermission):
                 return True
 
             try:
-                supplier_grocery = neo4j_user.responsible_for.single()
-                if not supplier_grocery:
+                supplier_grocery_uid = get_supplier_grocery_uid(request)
+                if not supplier_grocery_uid:
                     return False
 
                 if hasattr(obj, "belongs_to_grocery"):
-                    item_grocery = obj.belongs_to_grocery.single()
-                    return item_grocery and item_grocery.uid == supplier_grocery.uid
+                    return object_grocery_uid(obj) == supplier_grocery_uid
 
             except Exception:
                 return False
@@ -0,0 +1,112 @@
+"""Opt-in fast read path for list endpoints.
+
+With ``API_FAST_READS`` enabled, list views project just the columns their
+serializer renders (see :class:`~api.queries.RecordQuery`) and convert
+them with a :class:`FieldPlan` precomputed from that serializer, instead of
+inflating neomodel nodes and running DRF field-by-field serialization. The
+output matches the serializer's, key order included.
+"""
+
+import copy
+from datetime import datetime
+
+import pytz
+from django.conf import settings
+from rest_framework import serializers
+
+from .queries import (
+    GROCERY_RELATED,
+    INCOME_RELATED,
+    ITEM_RELATED,
+    RecordQuery,
+    pick,
+)
+from .serializers import (
+    DailyIncomeSerializer,
+    GrocerySerializer,
+    ItemSerializer,
+    UserSerializer,
+)
+
+
+def fast_reads_enabled():
+    return getattr(settings, "API_FAST_READS", False)
+
+
+def _datetime(value):
+    # Same conversion as neomodel's DateTimeProperty.inflate followed by
+    # DRF's DateTimeField.to_representation in UTC.
+    value = datetime.utcfromtimestamp(value).replace(tzinfo=pytz.utc).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+# Checked in order, so subclasses (EmailField is a CharField) come first.
+_CONVERTERS = (
+    (serializers.SerializerMethodField, None),
+    (serializers.DateTimeField, _datetime),
+    (serializers.BooleanField, bool),
+    (serializers.IntegerField, int),
+    (serializers.FloatField, float),
+    (serializers.CharField, str),
+)
+
+
+class FieldPlan:
+    """Column expressions and converters for one serializer's output.
+
+    Plain fields read ``n.<source>``; method fields read the Cypher
+    expression of the same name from ``projections``.
+    """
+
+    def __init__(self, serializer_class, projections=None, alias="n"):
+        projections = projections or {}
+        self.columns = {}
+        self.fields = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            converter = next(
+                (conv for cls, conv in _CONVERTERS if isinstance(field, cls)), None
+            )
+            if isinstance(field, serializers.SerializerMethodField):
+                self.columns[name] = projections[name]
+            else:
+                self.columns[name] = f"{alias}.{field.source}"
+            self.fields.append((name, converter))
+
+    def only(self, fields):
+        """This plan restricted to ``fields`` (``None`` keeps every field)."""
+        if fields is None:
+            return self
+        plan = copy.copy(self)
+        plan.columns = pick(self.columns, fields)
+        plan.fields = [(name, conv) for name, conv in self.fields if name in fields]
+        return plan
+
+    def query(self, query):
+        """Turn a NodeQuery into a RecordQuery projecting this plan's columns
+        (plus ``uid``, which pagination keys on)."""
+        records = RecordQuery(
+            query.match, where=query.where, params=query.params, alias=query.alias
+        )
+        return records.project(**{"uid": f"{query.alias}.uid", **self.columns})
+
+    def render(self, records):
+        rendered = []
+        for record in records:
+            row = {}
+            for name, converter in self.fields:
+                value = getattr(record, name)
+                if converter is not None and value is not None:
+                    value = converter(value)
+                row[name] = value
+            rendered.append(row)
+        return rendered
+
+
+USER_PLAN = FieldPlan(UserSerializer)
+GROCERY_PLAN = FieldPlan(GrocerySerializer, GROCERY_RELATED)
+ITEM_PLAN = FieldPlan(ItemSerializer, ITEM_RELATED)
+INCOME_PLAN = FieldPlan(DailyIncomeSerializer, INCOME_RELATED)
@@ -0,0 +1,297 @@
+import copy
+from datetime import datetime, time
+from functools import lru_cache
+
+import pytz
+from neo4j import READ_ACCESS
+from neomodel import config, db
+
+
+# Related values the serializers render, projected with pattern
+# comprehensions so each row stays one row and needs no extra round trip.
+GROCERY_RELATED = {
+    "supplier_name": "head([(s:Supplier)-[:RESPONSIBLE_FOR]->(n) | s.name])",
+}
+
+# Aggregates for GroceryDetailSerializer, evaluated per grocery row inside
+# the same statement. They read the counters and day totals maintained by
+# api.rollups, and only scan items/incomes for groceries that have not been
+# materialized yet. ``date`` is stored as epoch seconds (UTC).
+_SINCE_30D = "date() - duration({days: 30})"
+_SINCE_YTD = "date.truncate('year', date())"
+
+
+def _income_sum(where=""):
+    return (
+        "reduce(total = 0.0, amount IN "
+        f"[(n)-[:HAS_INCOME]->(d:DailyIncome) {where}| d.amount] | total + amount)"
+    )
+
+
+def _day_total_sum(since):
+    return (
+        "reduce(total = 0.0, amount IN "
+        f"[(n)-[:HAS_DAY_TOTAL]->(t:DailyTotal) WHERE t.day >= toString({since}) "
+        "| t.total] | total + amount)"
+    )
+
+
+def _windowed_income(since):
+    return (
+        f"CASE WHEN n.income_total IS NULL "
+        f"THEN {_income_sum(f'WHERE d.date >= datetime({{date: {since}}}).epochSeconds ')} "
+        f"ELSE {_day_total_sum(since)} END"
+    )
+
+
+GROCERY_TOTALS = {
+    "items_count": (
+        "CASE WHEN n.active_items_count IS NULL "
+        "THEN COUNT { (n)-[:HAS_ITEM]->(i:Item) WHERE i.is_deleted = false } "
+        "ELSE n.active_items_count END"
+    ),
+    "total_income": (
+        f"CASE WHEN n.income_total IS NULL THEN {_income_sum()} ELSE n.income_total END"
+    ),
+    "total_income_30d": _windowed_income(_SINCE_30D),
+    "total_income_ytd": _windowed_income(_SINCE_YTD),
+}
+
+ITEM_RELATED = {
+    "grocery_name": "head([(g:Grocery)-[:HAS_ITEM]->(n) | g.name])",
+    "added_by_name": "head([(s:Supplier)-[:ADDED_ITEM]->(n) | s.name])",
+}
+
+INCOME_RELATED = {
+    "grocery_name": "head([(g:Grocery)-[:HAS_INCOME]->(n) | g.name])",
+    "recorded_by_name": "head([(s:Supplier)-[:RECORDED_INCOME]->(n) | s.name])",
+}
+
+ROLLUP_BUCKETS = ("day", "week", "month")
+
+
+def pick(projections, fields):
+    """The subset of ``projections`` needed to render ``fields`` (``None``
+    means every field)."""
+    if fields is None:
+        return projections
+    return {name: expr for name, expr in projections.items() if name in fields}
+
+
+# Records pulled from the server per round trip by NodeQuery.stream()
+STREAM_FETCH_SIZE = 1000
+
+# Outcomes of fetch_scoped() when no node is returned.
+NOT_FOUND = "not_found"
+FORBIDDEN = "forbidden"
+
+
+class NodeQuery:
+    """A parameterized Cypher read returning one node alias per row.
+
+    Views describe *what* to match; paginators and other consumers append
+    predicates, ordering and limits so the work happens inside Neo4j rather
+    than over fully materialized node lists in Python.
+    """
+
+    def __init__(self, match, where=None, params=None, alias="n", projections=None):
+        self.match = match
+        self.where = list(where or [])
+        self.params = dict(params or {})
+        self.alias = alias
+        self.projections = dict(projections or {})
+
+    def copy(self):
+        query = copy.copy(self)
+        query.where = list(self.where)
+        query.params = dict(self.params)
+        query.projections = dict(self.projections)
+        return query
+
+    def filter(self, condition, **params):
+        query = self.copy()
+        query.where.append(condition)
+        query.params.update(params)
+        return query
+
+    def project(self, **projections):
+        query = self.copy()
+        query.projections.update(projections)
+        return query
+
+    def only(self, fields):
+        """Drop projections not needed to render ``fields``."""
+        query = self.copy()
+        query.projections = dict(pick(self.projections, fields))
+        return query
+
+    def _matching(self):
+        lines = [self.match]
+        if self.where:
+            lines.append("WHERE " + " AND ".join(f"({c})" for c in self.where))
+        return lines
+
+    def build(self, order_by=None, limit=None, skip=None):
+        params = dict(self.params)
+        lines = self._matching()
+        lines.append("RETURN " + ", ".join(self.columns()))
+
+        if order_by:
+            lines.append("ORDER BY " + ", ".join(order_by))
+        if skip:
+            lines.append("SKIP $skip")
+            params["skip"] = skip
+        if limit is not None:
+            lines.append("LIMIT $limit")
+            params["limit"] = limit
+        return "\n".join(lines), params
+
+    def columns(self):
+        columns = [self.alias]
+        columns += [f"{expr} AS {name}" for name, expr in self.projections.items()]
+        return columns
+
+    def aggregate(self, *returns):
+        """Rows of ``RETURN <returns>`` over the matched nodes, e.g. grouped
+        sums, without fetching the nodes."""
+        lines = self._matching() + ["RETURN " + ", ".join(returns)]
+        results, _ = db.cypher_query("\n".join(lines), self.params)
+        return results
+
+    def count(self):
+        return self.aggregate(f"count({self.alias})")[0][0]
+
+    def fetch(self, order_by=None, limit=None, skip=None):
+        """Run the query, returning nodes with any extra columns attached
+        as ``node.prefetched``."""
+        query, params = self.build(order_by=order_by, limit=limit, skip=skip)
+        results, _ = db.cypher_query(query, params, resolve_objects=True)
+
+        nodes = []
+        names = list(self.projections)
+        for row in results:
+            node = row[0]
+            node.prefetched = dict(zip(names, row[1:]))
+            nodes.append(node)
+        return nodes
+
+    def first(self):
+        nodes = self.fetch(limit=1)
+        return nodes[0] if nodes else None
+
+    def stream(self, order_by=None, fetch_size=STREAM_FETCH_SIZE):
+        """Yield each row as a dict of the node's stored properties plus the
+        projected columns, pulling records from the server lazily.
+
+        Uses its own auto-commit read session rather than ``cypher_query``
+        (which materializes every record), so it can be consumed after the
+        view has returned, e.g. by a ``StreamingHttpResponse``.
+        """
+        query, params = self.build(order_by=order_by)
+        names = list(self.projections)
+
+        if not db.driver:
+            db.set_connection(url=config.DATABASE_URL)
+        with db.driver.session(
+            database=db._database_name,
+            default_access_mode=READ_ACCESS,
+            fetch_size=fetch_size,
+        ) as session:
+            for record in session.run(query, params):
+                values = record.values()
+                row = dict(values[0])
+                row.update(zip(names, values[1:]))
+                yield row
+
+
+class Record:
+    """Base for the slotted row types built by :func:`record_type`."""
+
+    __slots__ = ()
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+
+@lru_cache(maxsize=None)
+def record_type(fields):
+    return type("Record", (Record,), {"__slots__": fields})
+
+
+class RecordQuery(NodeQuery):
+    """A NodeQuery that returns only its projected columns, as slotted
+    records, instead of inflating neomodel nodes."""
+
+    def columns(self):
+        return [f"{expr} AS {name}" for name, expr in self.projections.items()]
+
+    def fetch(self, order_by=None, limit=None):
+        query, params = self.build(order_by=order_by, limit=limit)
+        results, _ = db.cypher_query(query, params)
+        cls = record_type(tuple(self.projections))
+        return [cls(row) for row in results]
+
+
+def fetch_scoped(query, relationship, supplier_uid=None):
+    """Fetch the first node of ``query`` and, in the same statement, whether
+    ``supplier_uid`` owns it through
+    ``(:Supplier)-[:RESPONSIBLE_FOR]->(:Grocery)-[relationship]->(node)``.
+
+    Returns ``(node, None)``, ``(None, NOT_FOUND)`` or ``(None, FORBIDDEN)``.
+    Without a ``supplier_uid`` (admins) only existence is checked.
+    """
+    if supplier_uid is not None:
+        query = query.project(
+            owned=(
+                "EXISTS { (:Supplier {uid: $supplier_uid})-[:RESPONSIBLE_FOR]->"
+                f"(:Grocery)-[:{relationship}]->({query.alias}) }}"
+            )
+        )
+        query.params["supplier_uid"] = supplier_uid
+
+    node = query.first()
+    if node is None:
+        return None, NOT_FOUND
+    if supplier_uid is not None and not node.prefetched.pop("owned"):
+        return None, FORBIDDEN
+    return node, None
+
+
+def _epoch(day):
+    return datetime.combine(day, time.min, tzinfo=pytz.utc).timestamp()
+
+
+def income_rollup(bucket, start, end, grocery_uid=None, by_grocery=False):
+    """Aggregate daily income into ``bucket`` periods for ``[start, end)``.
+
+    ``bucket`` is a ``date.truncate`` unit from ``ROLLUP_BUCKETS`` (``week``
+    truncates to the ISO week's Monday). The date range predicate is applied
+    to ``DailyIncome.date`` directly so it can be served by its range index.
+    """
+    where = ["d.date >= $start", "d.date < $end"]
+    params = {"bucket": bucket, "start": _epoch(start), "end": _epoch(end)}
+    if grocery_uid:
+        where.append("g.uid = $grocery_uid")
+        params["grocery_uid"] = grocery_uid
+
+    group_columns = (
+        "g.uid AS grocery_id, g.name AS grocery_name, " if by_grocery else ""
+    )
+    query = f"""
+        MATCH (g:Grocery)-[:HAS_INCOME]->(d:DailyIncome)
+        WHERE {" AND ".join(where)}
+        WITH g, d, date.truncate($bucket, datetime({{epochSeconds: toInteger(d.date)}})) AS period
+        RETURN period, {group_columns}
+               sum(d.amount) AS total, count(d) AS count,
+               min(d.amount) AS min, max(d.amount) AS max, avg(d.amount) AS average
+        ORDER BY period{", grocery_name" if by_grocery else ""}
+    """
+    results, columns = db.cypher_query(query, params)
+
+    rows = []
+    for values in results:
+        row = dict(zip(columns, values))
+        row["period"] = row["period"].iso_format()
+        rows.append(row)
+    return rows
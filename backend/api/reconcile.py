@@ -0,0 +1,171 @@
+"""Batched reconciliation of Django ``auth_user`` rows with Neo4j users.
+
+Neo4j ``User`` nodes are the source of truth. Each one should have a Django
+user named after its email, as ``admin_utils.sync_django_user_for_admin``
+and ``sync_django_user_for_supplier`` create it, with the node's password
+hash (both stores use Django's hashers) and active flag. A Django user in
+the Admin or Supplier group without a node is deactivated, like
+``deactivate_django_user_by_email`` does. Users outside those groups, e.g.
+from ``create_superuser``, are left alone.
+
+Both passes walk one store in key order a batch at a time and look the
+batch up in the other store by its unique key, so no pass holds more than a
+batch of either store in memory.
+"""
+
+from django.contrib.auth.models import Group, User as DjangoUser
+from django.db import transaction
+from neomodel import db
+
+
+GROUPS = {"admin": "Admin", "supplier": "Supplier"}
+
+SYNCED_FIELDS = (
+    "email",
+    "first_name",
+    "password",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+def neo4j_users(after, limit):
+    """One batch of Neo4j users ordered by email, after ``after``."""
+    results, columns = db.cypher_query(
+        """
+        MATCH (u:User)
+        WHERE u.email > $after
+        RETURN u.email AS email, u.name AS name, u.password AS password,
+               u.user_type AS user_type, coalesce(u.is_active, true) AS is_active
+        ORDER BY u.email
+        LIMIT $limit
+        """,
+        {"after": after, "limit": limit},
+    )
+    return [dict(zip(columns, row)) for row in results]
+
+
+def existing_emails(emails):
+    results, _ = db.cypher_query(
+        """
+        UNWIND $emails AS email
+        MATCH (u:User {email: email})
+        RETURN email
+        """,
+        {"emails": list(emails)},
+    )
+    return {email for (email,) in results}
+
+
+def role_groups():
+    return {
+        role: Group.objects.get_or_create(name=name)[0] for role, name in GROUPS.items()
+    }
+
+
+def _expected(node):
+    return {
+        "email": node["email"],
+        "first_name": node["name"] or "",
+        "password": node["password"] or "",
+        "is_active": node["is_active"],
+        "is_staff": True,
+        "is_superuser": node["user_type"] == "admin",
+    }
+
+
+def sync_batch(nodes, groups, dry_run=False):
+    """Create or update the Django users of one batch of Neo4j users, and
+    put each in the group of its ``user_type`` only.
+
+    Returns ``(created, updated)`` usernames.
+    """
+    Membership = DjangoUser.groups.through
+    users = {
+        user.username: user
+        for user in DjangoUser.objects.filter(
+            username__in=[node["email"] for node in nodes]
+        ).only("id", "username", *SYNCED_FIELDS)
+    }
+    memberships = {
+        (user_id, group_id): membership_id
+        for membership_id, user_id, group_id in Membership.objects.filter(
+            user_id__in=[user.id for user in users.values()],
+            group_id__in=[group.id for group in groups.values()],
+        ).values_list("id", "user_id", "group_id")
+    }
+
+    to_create, to_update, updated = [], [], []
+    joins, leaves = {}, []
+    for node in nodes:
+        expected = _expected(node)
+        group = groups.get(node["user_type"])
+        user = users.get(node["email"])
+        if user is None:
+            to_create.append(DjangoUser(username=node["email"], **expected))
+            if group:
+                joins[node["email"]] = group
+            continue
+
+        changed = [f for f, value in expected.items() if getattr(user, f) != value]
+        for field in changed:
+            setattr(user, field, expected[field])
+        if changed:
+            to_update.append(user)
+        regrouped = False
+        for other in groups.values():
+            membership_id = memberships.get((user.id, other.id))
+            if other == group and membership_id is None:
+                joins[user.username] = group
+                regrouped = True
+            elif other != group and membership_id is not None:
+                leaves.append(membership_id)
+                regrouped = True
+        if changed or regrouped:
+            updated.append(user.username)
+
+    if not dry_run:
+        with transaction.atomic():
+            DjangoUser.objects.bulk_create(to_create)
+            DjangoUser.objects.bulk_update(to_update, SYNCED_FIELDS)
+            ids = dict(
+                DjangoUser.objects.filter(username__in=list(joins)).values_list(
+                    "username", "id"
+                )
+            )
+            Membership.objects.bulk_create(
+                [
+                    Membership(user_id=ids[username], group_id=group.id)
+                    for username, group in joins.items()
+                ],
+                ignore_conflicts=True,
+            )
+            Membership.objects.filter(id__in=leaves).delete()
+    return [user.username for user in to_create], updated
+
+
+def deactivate_orphans(after_id, limit, groups, dry_run=False):
+    """Deactivate active Django users of the Admin/Supplier groups, from one
+    batch ordered by id after ``after_id``, that have no Neo4j user.
+
+    Returns ``(last_id, deactivated usernames)``; ``last_id`` is ``None``
+    once there are no users left.
+    """
+    batch = list(
+        DjangoUser.objects.filter(
+            id__gt=after_id, is_active=True, groups__in=groups.values()
+        )
+        .distinct()
+        .order_by("id")
+        .values_list("id", "username")[:limit]
+    )
+    if not batch:
+        return None, []
+    found = existing_emails(username for _, username in batch)
+    orphans = [(user_id, name) for user_id, name in batch if name not in found]
+    if orphans and not dry_run:
+        DjangoUser.objects.filter(id__in=[user_id for user_id, _ in orphans]).update(
+            is_active=False
+        )
+    return batch[-1][0], [name for _, name in orphans]
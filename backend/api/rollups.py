@@ -0,0 +1,242 @@
+"""Materialized per-grocery counters.
+
+A grocery node carries two counters which are deliberately *not* declared
+on the neomodel class, so ``Grocery.save()`` can never overwrite them with a
+stale in-memory value:
+
+* ``active_items_count``: items reached through ``HAS_ITEM`` that are not
+  soft-deleted
+* ``income_total``: sum of ``amount`` over incomes reached through
+  ``HAS_INCOME``
+
+Per-day income lives in ``(:Grocery)-[:HAS_DAY_TOTAL]->(:DailyTotal)`` nodes
+keyed by the UTC ISO date. A grocery whose counters are ``null`` has not been
+materialized yet (it predates this module and ``rebuild_rollups`` has not
+run); writers leave it alone and readers fall back to scanning.
+
+Each helper is a single Cypher statement, so it joins the caller's
+transaction when one is open and is atomic on its own otherwise.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+
+from neomodel import db
+
+from .cache import incomes_changed, items_changed, totals_changed
+
+
+# Epoch seconds to the UTC day key used by DailyTotal.day
+DAY_KEY = "toString(date(datetime({{epochSeconds: toInteger({0})}})))"
+
+
+def initialize_grocery(grocery_uid):
+    db.cypher_query(
+        """
+        MATCH (g:Grocery {uid: $uid})
+        WHERE g.active_items_count IS NULL
+        SET g.active_items_count = 0, g.income_total = 0.0
+        """,
+        {"uid": grocery_uid},
+    )
+
+
+def attach_item(grocery_uid, item_uid):
+    """Connect an item to a grocery, counting it if it is active."""
+    db.cypher_query(
+        """
+        MATCH (g:Grocery {uid: $grocery_uid}), (i:Item {uid: $item_uid})
+        WHERE NOT (g)-[:HAS_ITEM]->(i)
+        CREATE (g)-[:HAS_ITEM]->(i)
+        SET g.active_items_count =
+            g.active_items_count + CASE WHEN i.is_deleted THEN 0 ELSE 1 END
+        """,
+        {"grocery_uid": grocery_uid, "item_uid": item_uid},
+    )
+    items_changed(grocery_uid, [item_uid])
+
+
+def detach_item(grocery_uid, item_uid):
+    db.cypher_query(
+        """
+        MATCH (g:Grocery {uid: $grocery_uid})-[r:HAS_ITEM]->(i:Item {uid: $item_uid})
+        DELETE r
+        SET g.active_items_count =
+            g.active_items_count - CASE WHEN i.is_deleted THEN 0 ELSE 1 END
+        """,
+        {"grocery_uid": grocery_uid, "item_uid": item_uid},
+    )
+    items_changed(grocery_uid, [item_uid])
+
+
+def adjust_item_count_for_item(item_uid, delta):
+    # An unmaterialized (null) counter stays null; the grocery is still
+    # returned so its cached reads can be invalidated.
+    results, _ = db.cypher_query(
+        """
+        MATCH (g:Grocery)-[:HAS_ITEM]->(:Item {uid: $uid})
+        SET g.active_items_count = g.active_items_count + $delta
+        RETURN g.uid
+        """,
+        {"uid": item_uid, "delta": delta},
+    )
+    items_changed(results[0][0] if results else None, [item_uid])
+
+
+def attach_income(grocery_uid, income_uid):
+    """Connect an income to a grocery and add its stored amount to the
+    grocery's lifetime and per-day totals.
+
+    Setting ``income_total`` first write-locks the grocery, which serializes
+    concurrent MERGEs of the same day-total node.
+    """
+    db.cypher_query(
+        f"""
+        MATCH (g:Grocery {{uid: $grocery_uid}}), (d:DailyIncome {{uid: $income_uid}})
+        WHERE NOT (g)-[:HAS_INCOME]->(d)
+        CREATE (g)-[:HAS_INCOME]->(d)
+        WITH g, d
+        WHERE g.income_total IS NOT NULL
+        SET g.income_total = g.income_total + d.amount
+        MERGE (g)-[:HAS_DAY_TOTAL]->(t:DailyTotal {{day: {DAY_KEY.format("d.date")}}})
+          ON CREATE SET t.total = 0.0, t.count = 0
+        SET t.total = t.total + d.amount, t.count = t.count + 1
+        """,
+        {"grocery_uid": grocery_uid, "income_uid": income_uid},
+    )
+    incomes_changed(grocery_uid)
+
+
+def detach_income(grocery_uid, income_uid):
+    """Inverse of :func:`attach_income`; call it before changing an income's
+    amount or date so the stored values are the ones retracted."""
+    db.cypher_query(
+        f"""
+        MATCH (g:Grocery {{uid: $grocery_uid}})-[r:HAS_INCOME]->
+              (d:DailyIncome {{uid: $income_uid}})
+        DELETE r
+        WITH g, d
+        WHERE g.income_total IS NOT NULL
+        SET g.income_total = g.income_total - d.amount
+        WITH g, d
+        MATCH (g)-[:HAS_DAY_TOTAL]->(t:DailyTotal {{day: {DAY_KEY.format("d.date")}}})
+        SET t.total = t.total - d.amount, t.count = t.count - 1
+        WITH t
+        WHERE t.count <= 0
+        DETACH DELETE t
+        """,
+        {"grocery_uid": grocery_uid, "income_uid": income_uid},
+    )
+    incomes_changed(grocery_uid)
+
+
+def daily_totals(first_day, last_day, grocery_uid=None):
+    """Income per UTC day from ``first_day`` to ``last_day`` (dates,
+    inclusive), newest first, over every grocery or just ``grocery_uid``.
+
+    Materialized groceries are read from their day totals, the others from
+    their incomes; both branches are range seeks on an indexed property, so
+    the cost follows the window rather than the income history.
+    """
+    start = datetime.combine(first_day, time.min, timezone.utc)
+    end = datetime.combine(last_day + timedelta(days=1), time.min, timezone.utc)
+    results, _ = db.cypher_query(
+        f"""
+        CALL {{
+            MATCH (g:Grocery)-[:HAS_DAY_TOTAL]->(t:DailyTotal)
+            WHERE t.day >= $first_day AND t.day <= $last_day
+              AND g.income_total IS NOT NULL
+              AND ($grocery_uid IS NULL OR g.uid = $grocery_uid)
+            RETURN t.day AS day, t.total AS total
+            UNION ALL
+            MATCH (g:Grocery)-[:HAS_INCOME]->(d:DailyIncome)
+            WHERE d.date >= $start AND d.date < $end
+              AND g.income_total IS NULL
+              AND ($grocery_uid IS NULL OR g.uid = $grocery_uid)
+            RETURN {DAY_KEY.format("d.date")} AS day, d.amount AS total
+        }}
+        RETURN day, sum(total) AS total
+        ORDER BY day DESC
+        """,
+        {
+            "first_day": first_day.isoformat(),
+            "last_day": last_day.isoformat(),
+            "start": start.timestamp(),
+            "end": end.timestamp(),
+            "grocery_uid": grocery_uid,
+        },
+    )
+    return [(day, total) for day, total in results]
+
+
+def grand_total(grocery_uid=None):
+    """Lifetime income from the groceries' ``income_total`` counters."""
+    results, _ = db.cypher_query(
+        """
+        MATCH (g:Grocery)
+        WHERE $grocery_uid IS NULL OR g.uid = $grocery_uid
+        RETURN sum(CASE WHEN g.income_total IS NULL
+                   THEN reduce(s = 0.0, a IN
+                               [(g)-[:HAS_INCOME]->(d:DailyIncome) | d.amount]
+                               | s + a)
+                   ELSE g.income_total END)
+        """,
+        {"grocery_uid": grocery_uid},
+    )
+    return results[0][0] or 0.0
+
+
+def inspect_groceries(after, limit):
+    """Compare stored counters with freshly computed ones for one batch of
+    groceries ordered by uid, starting after ``after``."""
+    results, columns = db.cypher_query(
+        f"""
+        MATCH (g:Grocery)
+        WHERE g.uid > $after
+        WITH g ORDER BY g.uid LIMIT $limit
+        CALL {{
+            WITH g
+            MATCH (g)-[:HAS_INCOME]->(d:DailyIncome)
+            WITH g, {DAY_KEY.format("d.date")} AS day,
+                 sum(d.amount) AS total, count(d) AS n
+            OPTIONAL MATCH (g)-[:HAS_DAY_TOTAL]->(t:DailyTotal {{day: day}})
+            RETURN count(day) AS days,
+                   count(CASE WHEN t IS NULL OR abs(t.total - total) > 1e-6
+                              OR t.count <> n THEN 1 END) AS drifted_days
+        }}
+        RETURN g.uid AS uid, g.name AS name,
+               g.active_items_count AS stored_items,
+               COUNT {{ (g)-[:HAS_ITEM]->(i:Item) WHERE i.is_deleted = false }} AS items,
+               g.income_total AS stored_income,
+               reduce(s = 0.0, a IN [(g)-[:HAS_INCOME]->(d:DailyIncome) | d.amount]
+                      | s + a) AS income,
+               COUNT {{ (g)-[:HAS_DAY_TOTAL]->(:DailyTotal) }} AS stored_days,
+               days, drifted_days
+        """,
+        {"after": after, "limit": limit},
+    )
+    return [dict(zip(columns, row)) for row in results]
+
+
+def rebuild_groceries(grocery_uids):
+    """Recompute counters and day totals for the given groceries."""
+    db.cypher_query(
+        f"""
+        UNWIND $uids AS uid
+        MATCH (g:Grocery {{uid: uid}})
+        OPTIONAL MATCH (g)-[:HAS_DAY_TOTAL]->(old:DailyTotal)
+        DETACH DELETE old
+        WITH DISTINCT g
+        SET g.active_items_count =
+                COUNT {{ (g)-[:HAS_ITEM]->(i:Item) WHERE i.is_deleted = false }},
+            g.income_total =
+                reduce(s = 0.0, a IN [(g)-[:HAS_INCOME]->(d:DailyIncome) | d.amount]
+                       | s + a)
+        WITH g
+        MATCH (g)-[:HAS_INCOME]->(d:DailyIncome)
+        WITH g, {DAY_KEY.format("d.date")} AS day,
+             sum(d.amount) AS total, count(d) AS n
+        CREATE (g)-[:HAS_DAY_TOTAL]->(:DailyTotal {{day: day, total: total, count: n}})
+        """,
+        {"uids": list(grocery_uids)},
+    )
+    totals_changed(*grocery_uids)
@@ -0,0 +1,147 @@
+"""Full-text search over the FULLTEXT indexes declared in api.indexes.
+
+Each kind queries its own index and the hits are merged by relevance score,
+ties broken by uid, which is also the key ``/search/`` pages on. Scores of
+different indexes are not strictly comparable, but are close enough for one
+ranked list. Related names are projected only for the page that is returned,
+not for every hit.
+"""
+
+from collections import namedtuple
+import re
+
+from neomodel import db
+
+from .queries import GROCERY_RELATED, ITEM_RELATED, NodeQuery
+from .serializers import GrocerySerializer, ItemSerializer, UserSerializer
+
+
+MAX_TERMS = 10
+
+Target = namedtuple("Target", "index where scoped_where related serializer_class")
+
+TARGETS = {
+    "item": Target(
+        "item_search",
+        "n.is_deleted = false",
+        "EXISTS { (:Grocery {uid: $grocery_uid})-[:HAS_ITEM]->(n) }",
+        ITEM_RELATED,
+        ItemSerializer,
+    ),
+    "grocery": Target(
+        "grocery_search",
+        "n.is_active = true",
+        "n.uid = $grocery_uid",
+        GROCERY_RELATED,
+        GrocerySerializer,
+    ),
+    # Only searched unscoped, by admins
+    "user": Target("user_search", "true", None, {}, UserSerializer),
+}
+
+# Lucene query syntax characters
+_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def lucene_query(text):
+    """Turn free text into a Lucene query matching every term, as a whole
+    word or as a prefix. Returns ``None`` if there is nothing to search."""
+    # Terms without a letter or digit would analyze to nothing
+    terms = [term for term in text.split() if any(c.isalnum() for c in term)]
+    terms = [_SPECIAL.sub(r"\\\1", term.lower()) for term in terms[:MAX_TERMS]]
+    if not terms:
+        return None
+    # Wildcard terms are not analyzed, hence the lower() above
+    return " AND ".join(f"({term} OR {term}*)" for term in terms)
+
+
+def _branch(kind, target, scoped, after):
+    where = [target.where]
+    if scoped:
+        where.append(target.scoped_where)
+    if after:
+        where.append(
+            "(score < $after_score OR (score = $after_score AND n.uid > $after_uid))"
+        )
+    return f"""
+        CALL db.index.fulltext.queryNodes('{target.index}', $q) YIELD node, score
+        WITH node AS n, score
+        WHERE {" AND ".join(where)}
+        RETURN '{kind}' AS kind, n, score
+    """
+
+
+def _related(kind, target):
+    related = ", ".join(f"{name}: {expr}" for name, expr in target.related.items())
+    return f"""
+        WITH kind, n
+        WITH kind, n WHERE kind = '{kind}'
+        RETURN {{{related}}} AS related
+    """
+
+
+def search(text, kinds, limit, after=None, grocery_uid=None):
+    """Rank ``kinds`` hits for ``text``, ``limit`` at a time after the
+    ``(score, uid)`` key ``after``.
+
+    Returns ``(rows, next_key)``; ``next_key`` is ``None`` on the last page.
+    With ``grocery_uid``, items and groceries are limited to that grocery and
+    users are not searched.
+    """
+    query = lucene_query(text)
+    scoped = grocery_uid is not None
+    kinds = [kind for kind in kinds if not scoped or TARGETS[kind].scoped_where]
+    if query is None or not kinds:
+        return [], None
+
+    branches = [_branch(kind, TARGETS[kind], scoped, after) for kind in kinds]
+    related = [_related(kind, TARGETS[kind]) for kind in kinds]
+    results, _ = db.cypher_query(
+        f"""
+        CALL {{{" UNION ALL ".join(branches)}}}
+        WITH kind, n, score
+        ORDER BY score DESC, n.uid
+        LIMIT $limit
+        CALL {{{" UNION ALL ".join(related)}}}
+        RETURN kind, n, score, related
+        ORDER BY score DESC, n.uid
+        """,
+        {
+            "q": query,
+            "grocery_uid": grocery_uid,
+            "after_score": after[0] if after else None,
+            "after_uid": after[1] if after else None,
+            "limit": limit + 1,
+        },
+        resolve_objects=True,
+    )
+
+    rows = []
+    for kind, node, score, related in results[:limit]:
+        node.prefetched = related
+        rows.append(
+            {
+                "type": kind,
+                "uid": node.uid,
+                "score": score,
+                "data": TARGETS[kind].serializer_class(node).data,
+            }
+        )
+    next_key = None
+    if len(results) > limit:
+        next_key = (rows[-1]["score"], rows[-1]["uid"])
+    return rows, next_key
+
+
+def node_query(kind, text):
+    """A NodeQuery over every node of ``kind`` matching ``text``, whatever
+    its state, for callers that add their own scope and ordering. ``None``
+    if there is nothing to search."""
+    query = lucene_query(text)
+    if query is None:
+        return None
+    return NodeQuery(
+        "CALL db.index.fulltext.queryNodes($search_index, $search_query) "
+        "YIELD node AS n",
+        params={"search_index": TARGETS[kind].index, "search_query": query},
+    )
@@ -1,5 +1,57 @@
+from functools import lru_cache
+
 from rest_framework import serializers
 from .models import Admin, Supplier, Grocery, Item, DailyIncome
+from .queries import NodeQuery, GROCERY_TOTALS, pick
+from .transactions import atomic
+
+
+_MISSING = object()
+
+
+def prefetched_value(obj, name):
+    """Return a value projected alongside ``obj`` by a NodeQuery, or
+    ``_MISSING`` when the node was loaded without it."""
+    return getattr(obj, "prefetched", {}).get(name, _MISSING)
+
+
+@lru_cache(maxsize=None)
+def _field_names(serializer_class):
+    return tuple(
+        name
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    )
+
+
+def select_fields(request, serializer_class):
+    """Field names chosen by ``?fields=a,b`` and ``?exclude=c``, in the
+    serializer's order, or ``None`` when every field is wanted. Unknown names
+    are ignored."""
+    include = request.query_params.get("fields")
+    exclude = request.query_params.get("exclude")
+    if not include and not exclude:
+        return None
+
+    names = _field_names(serializer_class)
+    if include:
+        wanted = {name.strip() for name in include.split(",")}
+        names = [name for name in names if name in wanted]
+    if exclude:
+        unwanted = {name.strip() for name in exclude.split(",")}
+        names = [name for name in names if name not in unwanted]
+    return names
+
+
+class SparseFieldsMixin:
+    """Accept ``fields=[...]`` and drop every other field, so computed fields
+    that were not asked for are never evaluated."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
 
 class UserRegistrationSerializer(serializers.Serializer):
@@ -40,19 +92,17 @@ class SupplierRegistrationSerializer(UserRegistrationSerializer):
         supplier.name = validated_data["name"]
         supplier.email = validated_data["email"]
         supplier.set_password(validated_data["password"])
-        supplier.save()
 
-        if grocery_id:
-            try:
-                grocery = Grocery.nodes.get(uid=grocery_id)
-                supplier.responsible_for.connect(grocery)
-            except Grocery.DoesNotExist:
-                pass
+        with atomic():
+            supplier.save()
+            if grocery_id:
+                # an unknown grocery_id is ignored, as before
+                Supplier.assign_grocery(supplier.uid, grocery_id)
 
         return supplier
 
 
-class UserSerializer(serializers.Serializer):
+class UserSerializer(SparseFieldsMixin, serializers.Serializer):
     uid = serializers.CharField(read_only=True)
     name = serializers.CharField()
     email = serializers.EmailField()
@@ -67,7 +117,7 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField()
 
 
-class GrocerySerializer(serializers.Serializer):
+class GrocerySerializer(SparseFieldsMixin, serializers.Serializer):
     uid = serializers.CharField(read_only=True)
     name = serializers.CharField(max_length=100)
     location = serializers.CharField(max_length=200)
@@ -77,6 +127,9 @@ class GrocerySerializer(serializers.Serializer):
     supplier_name = serializers.SerializerMethodField()
 
     def get_supplier_name(self, obj):
+        value = prefetched_value(obj, "supplier_name")
+        if value is not _MISSING:
+            return value
         try:
             supplier = obj.supplier.single()
             return supplier.name if supplier else None
@@ -99,7 +152,7 @@ class GrocerySerializer(serializers.Serializer):
         return instance
 
 
-class ItemSerializer(serializers.Serializer):
+class ItemSerializer(SparseFieldsMixin, serializers.Serializer):
     uid = serializers.CharField(read_only=True)
     name = serializers.CharField(max_length=100)
     item_type = serializers.CharField(max_length=50)
@@ -112,6 +165,9 @@ class ItemSerializer(serializers.Serializer):
     added_by_name = serializers.SerializerMethodField()
 
     def get_grocery_name(self, obj):
+        value = prefetched_value(obj, "grocery_name")
+        if value is not _MISSING:
+            return value
         try:
             grocery = obj.belongs_to_grocery.single()
             return grocery.name if grocery else None
@@ -119,6 +175,9 @@ class ItemSerializer(serializers.Serializer):
             return None
 
     def get_added_by_name(self, obj):
+        value = prefetched_value(obj, "added_by_name")
+        if value is not _MISSING:
+            return value
         try:
             supplier = obj.added_by.single()
             return supplier.name if supplier else None
@@ -145,7 +204,7 @@ class ItemSerializer(serializers.Serializer):
         return instance
 
 
-class DailyIncomeSerializer(serializers.Serializer):
+class DailyIncomeSerializer(SparseFieldsMixin, serializers.Serializer):
     uid = serializers.CharField(read_only=True)
     date = serializers.DateTimeField()
     amount = serializers.FloatField(min_value=0)
@@ -155,6 +214,9 @@ class DailyIncomeSerializer(serializers.Serializer):
     recorded_by_name = serializers.SerializerMethodField()
 
     def get_grocery_name(self, obj):
+        value = prefetched_value(obj, "grocery_name")
+        if value is not _MISSING:
+            return value
         try:
             grocery = obj.grocery.single()
             return grocery.name if grocery else None
@@ -162,6 +224,9 @@ class DailyIncomeSerializer(serializers.Serializer):
             return None
 
     def get_recorded_by_name(self, obj):
+        value = prefetched_value(obj, "recorded_by_name")
+        if value is not _MISSING:
+            return value
         try:
             supplier = obj.recorded_by.single()
             return supplier.name if supplier else None
@@ -185,16 +250,34 @@ class DailyIncomeSerializer(serializers.Serializer):
 class GroceryDetailSerializer(GrocerySerializer):
     items_count = serializers.SerializerMethodField()
     total_income = serializers.SerializerMethodField()
+    total_income_30d = serializers.SerializerMethodField()
+    total_income_ytd = serializers.SerializerMethodField()
 
     def get_items_count(self, obj):
-        try:
-            return len([item for item in obj.items.all() if not item.is_deleted])
-        except:
-            return 0
+        return self._totals(obj)["items_count"]
 
     def get_total_income(self, obj):
-        try:
-            incomes = obj.daily_incomes.all()
-            return sum(income.amount for income in incomes)
-        except:
-            return 0
+        return self._totals(obj)["total_income"]
+
+    def get_total_income_30d(self, obj):
+        return self._totals(obj)["total_income_30d"]
+
+    def get_total_income_ytd(self, obj):
+        return self._totals(obj)["total_income_ytd"]
+
+    def _totals(self, obj):
+        """Aggregates projected by the view, or fetched in one query for
+        groceries loaded without them."""
+        prefetched = getattr(obj, "prefetched", {})
+        projections = pick(GROCERY_TOTALS, self.fields)
+        if all(name in prefetched for name in projections):
+            return prefetched
+
+        node = NodeQuery(
+            "MATCH (n:Grocery {uid: $uid})",
+            params={"uid": obj.uid},
+            projections=projections,
+        ).first()
+        totals = node.prefetched if node else dict.fromkeys(projections, 0)
+        obj.prefetched = {**prefetched, **totals}
+        return obj.prefetched
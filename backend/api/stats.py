@@ -0,0 +1,145 @@
+"""Graph statistics for the admin's database stats page.
+
+Label and relationship counts are ``count()`` over a bare pattern, which
+Neo4j answers from its count store without touching the nodes. The whole
+report is cached for ``NEO4J_STATS_TIMEOUT`` seconds, so reloading the page
+does not rerun it.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from neo4j.exceptions import ClientError
+from neomodel import db
+
+from . import indexes
+
+
+CACHE_KEY = "neo4j_stats"
+
+LABELS = {
+    "Admins": "Admin",
+    "Suppliers": "Supplier",
+    "Groceries": "Grocery",
+    "Items": "Item",
+    "Daily Income Records": "DailyIncome",
+    "Daily Totals": "DailyTotal",
+}
+
+TOP_GROCERIES = 10
+
+
+def timeout():
+    return getattr(settings, "NEO4J_STATS_TIMEOUT", 60)
+
+
+def label_counts():
+    query = " UNION ALL ".join(
+        f"MATCH (n:{label}) RETURN '{name}' AS name, count(n) AS count"
+        for name, label in LABELS.items()
+    )
+    results, _ = db.cypher_query(query)
+    return dict(results)
+
+
+def relationship_counts():
+    types, _ = db.cypher_query(
+        "CALL db.relationshipTypes() YIELD relationshipType "
+        "RETURN relationshipType ORDER BY relationshipType"
+    )
+    if not types:
+        return {}
+    query = " UNION ALL ".join(
+        f"MATCH ()-[r:`{name.replace('`', '``')}`]->() "
+        f"RETURN $types[{i}] AS type, count(r) AS count"
+        for i, (name,) in enumerate(types)
+    )
+    results, _ = db.cypher_query(query, {"types": [name for (name,) in types]})
+    return dict(results)
+
+
+def item_states():
+    # is_deleted leads the (is_deleted, created_at) index, so the deleted
+    # count is a seek; created_at is always set
+    results, _ = db.cypher_query(
+        """
+        CALL { MATCH (i:Item) RETURN count(i) AS total }
+        CALL {
+            MATCH (i:Item)
+            WHERE i.is_deleted = true AND i.created_at IS NOT NULL
+            RETURN count(i) AS deleted
+        }
+        RETURN total - deleted AS active, deleted
+        """
+    )
+    active, deleted = results[0]
+    return {"active": active, "deleted": deleted}
+
+
+def top_groceries(limit=TOP_GROCERIES):
+    """Groceries with the most items, with their income and day-total
+    counts; degrees are read from the relationship store."""
+    results, columns = db.cypher_query(
+        """
+        MATCH (g:Grocery)
+        WITH g, COUNT { (g)-[:HAS_ITEM]->() } AS items
+        ORDER BY items DESC, g.name
+        LIMIT $limit
+        RETURN g.uid AS uid, g.name AS name, items,
+               COUNT { (g)-[:HAS_INCOME]->() } AS incomes,
+               COUNT { (g)-[:HAS_DAY_TOTAL]->() } AS days
+        """,
+        {"limit": limit},
+    )
+    return [dict(zip(columns, row)) for row in results]
+
+
+def store_sizes():
+    """Store sizes in bytes from the ``store.size`` metrics, or an empty
+    dict where JMX metrics are not exposed (they are off by default)."""
+    try:
+        results, _ = db.cypher_query(
+            "CALL dbms.queryJmx('neo4j.metrics:*') YIELD name, attributes "
+            "WHERE name CONTAINS 'store.size' "
+            "RETURN name, attributes.Value.value"
+        )
+    except ClientError:
+        return {}
+    return {name.split("name=", 1)[-1]: value for name, value in results}
+
+
+def index_report():
+    return [
+        {
+            "name": row["name"],
+            "type": row["type"],
+            "label": ",".join(row["labelsOrTypes"]),
+            "properties": ", ".join(row["properties"]),
+            "state": row["state"],
+            "population": row["populationPercent"],
+            "reads": row["readCount"],
+        }
+        for row in sorted(indexes.existing(), key=lambda row: row["name"])
+    ]
+
+
+def collect():
+    counts = label_counts()
+    return {
+        "stats": counts,
+        "total_nodes": sum(counts.values()),
+        "relationships": relationship_counts(),
+        "items": item_states(),
+        "top_groceries": top_groceries(),
+        "indexes": index_report(),
+        "store_sizes": store_sizes(),
+    }
+
+
+def get(refresh=False):
+    """The cached report, collected again when it has expired or
+    ``refresh`` is set."""
+    report = None if refresh else cache.get(CACHE_KEY)
+    if report is None:
+        report = collect()
+        cache.set(CACHE_KEY, report, timeout())
+    return report
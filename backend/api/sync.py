@@ -0,0 +1,121 @@
+"""Delta feed behind ``GET /sync/``.
+
+Groceries, items, incomes and users are read in ``(updated_at, uid)`` order
+starting strictly after the client's cursor, one range-index seek per label
+(``BaseNode.updated_at`` is indexed), so a client that keeps its cursor pays
+for the rows that changed rather than for the whole catalog. Soft deletes
+are reported as tombstones: an item with ``is_deleted``, or a grocery or user
+with ``is_active`` false.
+
+Only writes older than ``SYNC_SETTLE_SECONDS`` are returned. ``updated_at``
+is stamped before a transaction commits, so a row may become visible with a
+timestamp behind rows a client has already seen; holding back the newest
+seconds keeps the cursor from moving past such rows.
+
+Related display names (``grocery_name``, ``supplier_name``, ...) are sent as
+of each row's own last change; renaming a supplier does not re-send every row
+that shows its name.
+"""
+
+from collections import namedtuple
+import time
+
+from django.conf import settings
+from neomodel import db
+
+from .queries import GROCERY_RELATED, INCOME_RELATED, ITEM_RELATED
+from .serializers import (
+    DailyIncomeSerializer,
+    GrocerySerializer,
+    ItemSerializer,
+    UserSerializer,
+)
+
+
+Feed = namedtuple("Feed", "match scoped_match deleted related serializer_class")
+
+FEEDS = {
+    "grocery": Feed(
+        "MATCH (n:Grocery)",
+        "MATCH (n:Grocery {uid: $grocery_uid})",
+        "NOT n.is_active",
+        GROCERY_RELATED,
+        GrocerySerializer,
+    ),
+    "item": Feed(
+        "MATCH (n:Item)",
+        "MATCH (:Grocery {uid: $grocery_uid})-[:HAS_ITEM]->(n:Item)",
+        "n.is_deleted",
+        ITEM_RELATED,
+        ItemSerializer,
+    ),
+    "income": Feed(
+        "MATCH (n:DailyIncome)",
+        "MATCH (:Grocery {uid: $grocery_uid})-[:HAS_INCOME]->(n:DailyIncome)",
+        "false",
+        INCOME_RELATED,
+        DailyIncomeSerializer,
+    ),
+    # Users are not tied to a grocery and only synced unscoped
+    "user": Feed("MATCH (n:User)", None, "NOT n.is_active", {}, UserSerializer),
+}
+
+
+def settle_seconds():
+    return getattr(settings, "SYNC_SETTLE_SECONDS", 5)
+
+
+def _branch(kind, feed, scoped):
+    related = ", ".join(f"{name}: {expr}" for name, expr in feed.related.items())
+    return f"""
+        {feed.scoped_match if scoped else feed.match}
+        WHERE n.updated_at >= $since AND n.updated_at <= $until
+          AND (n.updated_at > $since OR n.uid > $since_uid)
+        RETURN '{kind}' AS kind, n, {feed.deleted} AS deleted,
+               {{{related}}} AS related, n.updated_at AS stamp
+        ORDER BY stamp, n.uid
+        LIMIT $limit
+    """
+
+
+def changes(since, limit, grocery_uid=None):
+    """Up to ``limit`` changes after the ``(updated_at, uid)`` key ``since``.
+
+    Returns ``(rows, last_key, has_more)``; ``last_key`` is ``since`` when
+    nothing changed. With ``grocery_uid`` only that grocery, its items and
+    its incomes are read.
+    """
+    scoped = grocery_uid is not None
+    branches = [
+        _branch(kind, feed, scoped)
+        for kind, feed in FEEDS.items()
+        if not scoped or feed.scoped_match
+    ]
+    query = f"""
+        CALL {{{" UNION ALL ".join(branches)}}}
+        RETURN kind, n, deleted, related, stamp
+        ORDER BY stamp, n.uid
+        LIMIT $limit
+    """
+    results, _ = db.cypher_query(
+        query,
+        {
+            "since": since[0],
+            "since_uid": since[1],
+            "until": time.time() - settle_seconds(),
+            "grocery_uid": grocery_uid,
+            "limit": limit + 1,
+        },
+        resolve_objects=True,
+    )
+
+    rows = []
+    last_key = since
+    for kind, node, deleted, related, stamp in results[:limit]:
+        data = None
+        if not deleted:
+            node.prefetched = related
+            data = FEEDS[kind].serializer_class(node).data
+        rows.append({"type": kind, "uid": node.uid, "deleted": deleted, "data": data})
+        last_key = (stamp, node.uid)
+    return rows, last_key, len(results) > limit
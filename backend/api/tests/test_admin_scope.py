@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group, User as DjangoUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.test import RequestFactory
+
+from api import admin_utils
+from api.admin_utils import SCOPE_SESSION_KEY, admin_scope
+from api.cache import ResponseCache
+from api.models import Supplier
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class AdminScopeTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.supplier_user = DjangoUser.objects.create_user(
+            "sup1", "sup1@example.com", "pass", is_staff=True
+        )
+        group, _ = Group.objects.get_or_create(name="Supplier")
+        self.supplier_user.groups.add(group)
+        self.session = SessionStore()
+
+    def _request(self, user):
+        request = RequestFactory().get("/admin/")
+        request.user = user
+        request.session = self.session
+        return request
+
+    def test_roles(self):
+        staff = DjangoUser.objects.create_user("staff", is_staff=True)
+        plain = DjangoUser.objects.create_user("plain")
+        self.assertTrue(admin_scope(self._request(staff)).is_admin)
+        self.assertIsNone(admin_scope(self._request(plain)).role)
+
+        scope = admin_scope(self._request(self.supplier_user))
+        self.assertTrue(scope.is_supplier)
+        self.assertFalse(scope.is_admin)
+        self.assertTrue(scope.can_manage("Item"))
+        self.assertFalse(scope.can_manage("Grocery"))
+        self.assertEqual(scope.supplier_uid, self.supplier1.uid)
+        self.assertEqual(scope.grocery_uid, self.grocery1.uid)
+
+    def _count_queries(self, *requests):
+        with mock.patch.object(
+            admin_utils.db, "cypher_query", wraps=admin_utils.db.cypher_query
+        ) as cypher_query:
+            for request in requests:
+                self.assertIs(admin_scope(request), admin_scope(request))
+        return cypher_query.call_count
+
+    @mock.patch.object(ResponseCache, "shared", True)
+    def test_resolved_once_per_request_and_kept_in_session(self):
+        requests = [self._request(self.supplier_user) for _ in range(2)]
+        self.assertEqual(self._count_queries(*requests), 1)
+
+    @mock.patch.object(ResponseCache, "shared", True)
+    def test_reassignment_invalidates_session(self):
+        admin_scope(self._request(self.supplier_user))
+        Supplier.assign_grocery(self.supplier1.uid, self.grocery2.uid)
+        scope = admin_scope(self._request(self.supplier_user))
+        self.assertEqual(scope.grocery_uid, self.grocery2.uid)
+
+    @mock.patch.object(ResponseCache, "shared", False)
+    def test_not_kept_in_session_without_shared_cache(self):
+        requests = [self._request(self.supplier_user) for _ in range(2)]
+        self.assertEqual(self._count_queries(*requests), 2)
+        self.assertNotIn(SCOPE_SESSION_KEY, self.session)
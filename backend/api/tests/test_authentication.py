@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from neomodel import db
+from rest_framework import status
+
+from api.authentication import user_cache
+from api.cache import LRUCache
+from api.models import Supplier
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class LRUCacheTestCase(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_size=2, ttl=5)
+        with mock.patch("api.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with mock.patch("api.cache.time.monotonic", return_value=104.0):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch("api.cache.time.monotonic", return_value=106.0):
+            self.assertIsNone(cache.get("a"))
+
+
+class UserResolutionTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        user_cache.clear()
+
+    def _delete_admin_node(self):
+        db.cypher_query(
+            "MATCH (u:User {uid: $uid}) DETACH DELETE u", {"uid": self.admin.uid}
+        )
+        user_cache.clear()
+
+    def test_profile_reflects_update_through_cache(self):
+        url = reverse("profile")
+        resp = self.client.get(url, **self.supplier1_headers)
+        self.assertEqual(resp.data["user"]["name"], "Supplier One")
+
+        self.client.put(
+            reverse("user-detail", args=[self.supplier1.uid]),
+            {"name": "Supplier Renamed"},
+            format="json",
+            **self.admin_headers,
+        )
+        resp = self.client.get(url, **self.supplier1_headers)
+        self.assertEqual(resp.data["user"]["name"], "Supplier Renamed")
+
+    def test_unknown_user_is_rejected_by_default(self):
+        self._delete_admin_node()
+        resp = self.client.get(reverse("user-list"), **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(JWT_TRUST_USER_CLAIMS=True)
+    def test_trusted_claims_skip_user_lookup(self):
+        self._delete_admin_node()
+        resp = self.client.get(reverse("user-list"), **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        resp = self.client.get(reverse("user-list"), **self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reassignment_invalidates_supplier_grocery(self):
+        url = reverse("dailyincome-list")
+        payload = {"date": "2024-03-04T10:00:00Z", "amount": 10.0}
+
+        resp = self.client.post(url, payload, format="json", **self.supplier2_headers)
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+        assign_url = reverse("grocery-assign-supplier", args=[self.grocery2.uid])
+        resp = self.client.post(
+            assign_url,
+            {"supplier_id": self.supplier2.uid},
+            format="json",
+            **self.admin_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        resp = self.client.post(url, payload, format="json", **self.supplier2_headers)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["grocery_name"], self.grocery2.name)
+
+    def test_reassignment_elsewhere_applies_to_next_request(self):
+        # As if another worker handled the reassignment: nothing in this
+        # process is told about it.
+        url = reverse("dailyincome-list")
+        payload = {"date": "2024-03-04T10:00:00Z", "amount": 10.0}
+        resp = self.client.post(url, payload, format="json", **self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+
+        Supplier.assign_grocery(self.supplier1.uid, self.grocery2.uid)
+        resp = self.client.post(url, payload, format="json", **self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["grocery_name"], self.grocery2.name)
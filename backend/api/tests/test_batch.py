@@ -0,0 +1,82 @@
+from django.urls import reverse
+from rest_framework import status
+
+from api.models import Item
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class ItemBatchTestCase(BaseAPITestCase):
+    url = reverse("item-batch")
+
+    def _item(self, name, price=1.0):
+        return {
+            "op": "create",
+            "name": name,
+            "item_type": "food",
+            "item_location": "first roof",
+            "price": price,
+        }
+
+    def test_supplier_batch_reports_each_row(self):
+        operations = [self._item(f"Item {i}") for i in range(5)]
+        operations.append({"op": "create", "name": "No price"})
+        operations.append({"op": "delete", "uid": self.other_item.uid})
+
+        resp = self.client.post(
+            self.url,
+            {"operations": operations},
+            format="json",
+            **self.supplier1_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        statuses = [r["status"] for r in resp.data["results"]]
+        self.assertEqual(statuses, ["created"] * 5 + ["invalid", "not_found"])
+        self.assertEqual(resp.data["summary"]["created"], 5)
+
+        created = Item.nodes.get(uid=resp.data["results"][0]["uid"])
+        self.assertEqual(created.belongs_to_grocery.single().uid, self.grocery1.uid)
+        self.assertEqual(created.added_by.single().uid, self.supplier1.uid)
+        self.assertFalse(Item.nodes.get(uid=self.other_item.uid).is_deleted)
+
+    def test_admin_batch_updates_and_deletes(self):
+        resp = self.client.post(
+            self.url,
+            {
+                "grocery_id": self.grocery2.uid,
+                "operations": [
+                    {"op": "update", "uid": self.other_item.uid, "price": 12.0},
+                    {"op": "delete", "uid": self.other_item.uid},
+                ],
+            },
+            format="json",
+            **self.admin_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["summary"], {"updated": 1, "deleted": 1})
+
+        item = Item.nodes.get(uid=self.other_item.uid)
+        self.assertEqual(item.price, 12.0)
+        self.assertTrue(item.is_deleted)
+
+        detail = self.client.get(
+            reverse("grocery-detail", args=[self.grocery2.uid]), **self.admin_headers
+        )
+        self.assertEqual(detail.data["items_count"], 0)
+
+    def test_supplier_cannot_batch_other_grocery(self):
+        resp = self.client.post(
+            self.url,
+            {"grocery_id": self.grocery2.uid, "operations": [self._item("Apple")]},
+            format="json",
+            **self.supplier1_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_empty_batch_is_rejected(self):
+        resp = self.client.post(
+            self.url,
+            {"grocery_id": self.grocery2.uid, "operations": []},
+            format="json",
+            **self.admin_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
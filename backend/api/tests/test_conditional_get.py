@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+
+from api import queries
+from api.cache import ResponseCache
+from api.tests.test_requirements import BaseAPITestCase
+
+
+@mock.patch.object(ResponseCache, "shared", True)
+class ConditionalGetTestCase(BaseAPITestCase):
+    def test_unchanged_list_is_not_modified(self):
+        url = reverse("item-list")
+        resp = self.client.get(
+            url, {"grocery_id": self.grocery2.uid}, **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        etag = resp["ETag"]
+        self.assertIn("Last-Modified", resp)
+
+        resp = self.client.get(
+            url,
+            {"grocery_id": self.grocery2.uid},
+            HTTP_IF_NONE_MATCH=etag,
+            **self.admin_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp.content, b"")
+
+        # another page or fieldset is another representation
+        resp = self.client.get(
+            url,
+            {"grocery_id": self.grocery2.uid, "fields": "uid"},
+            HTTP_IF_NONE_MATCH=etag,
+            **self.admin_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_writes_change_the_etag(self):
+        url = reverse("item-list")
+        etag = self.client.get(url, **self.admin_headers)["ETag"]
+
+        detail_url = reverse("item-detail", args=[self.other_item.uid])
+        self.client.put(
+            detail_url, {"price": 31.0}, format="json", **self.admin_headers
+        )
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        etag = resp["ETag"]
+
+        self.client.delete(detail_url, **self.admin_headers)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["results"], [])
+
+    def test_related_rename_changes_grocery_list_etag(self):
+        url = reverse("grocery-list")
+        etag = self.client.get(url, **self.admin_headers)["ETag"]
+        self.supplier1.name = "Supplier Uno"
+        self.supplier1.save()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        url = reverse("item-detail", args=[self.other_item.uid])
+        resp = self.client.get(url, **self.admin_headers)
+        resp = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"], **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_income_etags_differ_per_supplier_scope(self):
+        url = reverse("dailyincome-list")
+        resp = self.client.get(url, **self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        admin = self.client.get(url, **self.admin_headers)
+        self.assertNotEqual(resp["ETag"], admin["ETag"])
+
+    def test_not_modified_check_skips_the_graph(self):
+        url = reverse("item-list")
+        etag = self.client.get(url, **self.admin_headers)["ETag"]
+        with mock.patch.object(queries.db, "cypher_query") as cypher_query:
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        cypher_query.assert_not_called()
+
+    def test_new_income_changes_income_etag(self):
+        url = reverse("dailyincome-list")
+        etag = self.client.get(url, **self.supplier1_headers)["ETag"]
+        self.client.post(
+            url,
+            {"date": "2024-03-04T10:00:00Z", "amount": 10.0},
+            format="json",
+            **self.supplier1_headers,
+        )
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["results"]), 1)
+
+    def test_details_are_conditional(self):
+        url = reverse("dailyincome-list")
+        resp = self.client.post(
+            url,
+            {"date": "2024-03-04T10:00:00Z", "amount": 10.0},
+            format="json",
+            **self.supplier1_headers,
+        )
+        income_url = reverse("dailyincome-detail", args=[resp.data["uid"]])
+        grocery_url = reverse("grocery-detail", args=[self.grocery1.uid])
+        etags = {}
+        for url in (income_url, grocery_url):
+            etags[url] = self.client.get(url, **self.supplier1_headers)["ETag"]
+            resp = self.client.get(
+                url, HTTP_IF_NONE_MATCH=etags[url], **self.supplier1_headers
+            )
+            self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED, url)
+
+        # Validators are per caller, so they never skip the ownership check
+        resp = self.client.get(
+            income_url, HTTP_IF_NONE_MATCH=etags[income_url], **self.supplier2_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_no_validators_without_shared_cache(self):
+        url = reverse("item-list")
+        with mock.patch.object(ResponseCache, "shared", False):
+            resp = self.client.get(url, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", resp)
+        self.assertNotIn("Last-Modified", resp)
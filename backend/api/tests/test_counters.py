@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from neomodel import db
+from rest_framework import status
+
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class GroceryCounterTestCase(BaseAPITestCase):
+    def _counters(self, grocery):
+        results, _ = db.cypher_query(
+            """
+            MATCH (g:Grocery {uid: $uid})
+            RETURN g.active_items_count, g.income_total,
+                   [(g)-[:HAS_DAY_TOTAL]->(t:DailyTotal) | [t.day, t.total, t.count]]
+            """,
+            {"uid": grocery.uid},
+        )
+        return results[0]
+
+    def test_item_writes_maintain_active_count(self):
+        self.assertEqual(self._counters(self.grocery2)[0], 1)
+
+        payload = {
+            "name": "Milk",
+            "item_type": "food",
+            "item_location": "first roof",
+            "price": 4.5,
+            "grocery_id": self.grocery1.uid,
+        }
+        resp = self.client.post(
+            reverse("item-list"), payload, format="json", **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._counters(self.grocery1)[0], 1)
+
+        detail_url = reverse("item-detail", args=[resp.data["uid"]])
+        self.client.delete(detail_url, **self.admin_headers)
+        self.assertEqual(self._counters(self.grocery1)[0], 0)
+
+    def test_income_writes_maintain_totals(self):
+        url = reverse("dailyincome-list")
+        for amount in (100.0, 25.0):
+            resp = self.client.post(
+                url,
+                {"date": "2024-03-04T10:00:00Z", "amount": amount},
+                format="json",
+                **self.supplier1_headers,
+            )
+            self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+
+        _, income, days = self._counters(self.grocery1)
+        self.assertEqual(income, 125.0)
+        self.assertEqual(days, [["2024-03-04", 125.0, 2]])
+
+    def test_rebuild_rollups_repairs_drift(self):
+        db.cypher_query(
+            "MATCH (g:Grocery {uid: $uid}) SET g.active_items_count = 42",
+            {"uid": self.grocery2.uid},
+        )
+        out = StringIO()
+        call_command("rebuild_rollups", "--dry-run", stdout=out)
+        self.assertIn("1 with drift", out.getvalue())
+        self.assertEqual(self._counters(self.grocery2)[0], 42)
+
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(self._counters(self.grocery2)[0], 1)
+
+        out = StringIO()
+        call_command("rebuild_rollups", "--dry-run", stdout=out)
+        self.assertIn("0 with drift", out.getvalue())
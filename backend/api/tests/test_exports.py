@@ -0,0 +1,44 @@
+import json
+from datetime import datetime
+
+from django.urls import reverse
+from rest_framework import status
+
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class ExportTestCase(BaseAPITestCase):
+    def _content(self, response):
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_item_export_streams_ndjson(self):
+        resp = self.client.get(reverse("item-export"), **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in self._content(resp).splitlines()]
+        self.assertEqual([r["uid"] for r in rows], [self.other_item.uid])
+        self.assertEqual(rows[0]["grocery_name"], "Daily Goods")
+
+    def test_income_export_is_scoped_for_suppliers(self):
+        income_url = reverse("dailyincome-list")
+        payload = {"date": datetime.utcnow().isoformat() + "Z", "amount": 10.0}
+        self.client.post(income_url, payload, format="json", **self.supplier1_headers)
+        payload["grocery_id"] = self.grocery2.uid
+        self.client.post(income_url, payload, format="json", **self.admin_headers)
+
+        resp = self.client.get(
+            reverse("dailyincome-export"), {"output": "csv"}, **self.supplier1_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        lines = self._content(resp).splitlines()
+        self.assertTrue(lines[0].startswith("uid,date,amount"))
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Fresh Mart", lines[1])
+
+    def test_unknown_output_is_rejected(self):
+        resp = self.client.get(
+            reverse("item-export"), {"output": "xml"}, **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from django.test import override_settings
+from django.urls import reverse
+
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class FastReadPathTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        payload = {"date": datetime.utcnow().isoformat() + "Z", "amount": 12.5}
+        self.client.post(
+            reverse("dailyincome-list"),
+            payload,
+            format="json",
+            **self.supplier1_headers,
+        )
+
+    def test_list_output_is_byte_identical(self):
+        for name in ("user-list", "grocery-list", "item-list", "dailyincome-list"):
+            url = reverse(name)
+            with override_settings(API_FAST_READS=False, API_CACHE_ENABLED=False):
+                slow = self.client.get(url, {"page_size": 2}, **self.admin_headers)
+            with override_settings(API_FAST_READS=True, API_CACHE_ENABLED=False):
+                fast = self.client.get(url, {"page_size": 2}, **self.admin_headers)
+            self.assertEqual(fast.status_code, slow.status_code)
+            self.assertEqual(fast.content, slow.content, name)
@@ -0,0 +1,74 @@
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from api import filters, indexes, rollups
+from api.models import Item
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class FilterRegistryTestCase(SimpleTestCase):
+    def test_filtered_properties_are_indexed(self):
+        indexed = {
+            index.properties[0]
+            for index in indexes.declared()
+            if index.kind == "RANGE" and index.label == "Item"
+        }
+        self.assertLessEqual(filters.ITEM_FILTERS.properties, indexed)
+
+    def test_timestamp(self):
+        self.assertEqual(filters.timestamp("1970-01-02"), 86400.0)
+        self.assertEqual(filters.timestamp("1970-01-01T01:00:00+01:00"), 0.0)
+        with self.assertRaises(ValueError):
+            filters.timestamp("yesterday")
+
+
+class ItemFilterTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for name, item_type, price in (
+            ("Apple", "food", 1.5),
+            ("Apricot", "food", 4.0),
+            ("Banana", "food", 2.5),
+            ("Broom", "home", 9.0),
+        ):
+            item = Item(
+                name=name, item_type=item_type, item_location="aisle", price=price
+            )
+            item.save()
+            rollups.attach_item(self.grocery1.uid, item.uid)
+
+    def _names(self, **params):
+        resp = self.client.get(reverse("item-list"), params, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        names = [row["name"] for row in resp.data["results"]]
+        while resp.data["next"]:
+            resp = self.client.get(resp.data["next"], **self.admin_headers)
+            names += [row["name"] for row in resp.data["results"]]
+        return names
+
+    def test_filters(self):
+        self.assertEqual(
+            self._names(item_type="food", min_price=2, ordering="price"),
+            ["Banana", "Apricot"],
+        )
+        self.assertEqual(
+            self._names(name_prefix="Ap", ordering="name"), ["Apple", "Apricot"]
+        )
+        self.assertEqual(self._names(created_before="2000-01-01"), [])
+
+    def test_ordering_pages_with_cursor(self):
+        for fast in (False, True):
+            with override_settings(API_FAST_READS=fast):
+                self.assertEqual(
+                    self._names(ordering="-price", page_size=2),
+                    ["Chess Board", "Broom", "Apricot", "Banana", "Apple"],
+                )
+
+    def test_invalid_parameters(self):
+        url = reverse("item-list")
+        resp = self.client.get(url, {"min_price": "cheap"}, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("min_price", resp.data)
+        resp = self.client.get(url, {"ordering": "item_location"}, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
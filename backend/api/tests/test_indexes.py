@@ -0,0 +1,58 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from api import indexes
+
+
+class IndexRegistryTestCase(SimpleTestCase):
+    def test_statements(self):
+        self.assertEqual(
+            indexes.create_statement(
+                indexes.Index("item_search", "FULLTEXT", "Item", ("name", "item_type"))
+            ),
+            "CREATE FULLTEXT INDEX item_search IF NOT EXISTS "
+            "FOR (n:Item) ON EACH [n.name, n.item_type]",
+        )
+        self.assertEqual(
+            indexes.create_statement(
+                indexes.Index(
+                    "item_live", "RANGE", "Item", ("is_deleted", "created_at")
+                )
+            ),
+            "CREATE RANGE INDEX item_live IF NOT EXISTS "
+            "FOR (n:Item) ON (n.is_deleted, n.created_at)",
+        )
+        declared = {indexes.schema(index) for index in indexes.declared()}
+        self.assertIn(("RANGE", "DailyIncome", ("date",)), declared)
+        self.assertIn(("RANGE", "Item", ("is_deleted", "created_at")), declared)
+
+    def test_prefix_of_composite_index_is_redundant(self):
+        def row(name, props, constraint=None):
+            return {
+                "name": name,
+                "schema": ("RANGE", "Item", props),
+                "owningConstraint": constraint,
+                "readCount": 1,
+            }
+
+        rows = [
+            row("item_is_deleted_created_at", ("is_deleted", "created_at")),
+            row("item_is_deleted", ("is_deleted",)),
+            row("item_created_at", ("created_at",)),
+            row("constraint_item_uid", ("uid",), "constraint_item_uid"),
+        ]
+        with mock.patch.object(indexes, "existing", return_value=rows):
+            report = indexes.diff()
+        self.assertEqual([r["name"] for r in report["redundant"]], ["item_is_deleted"])
+        self.assertEqual([r["name"] for r in report["undeclared"]], ["item_is_deleted"])
+
+    def test_sync_creates_missing_indexes(self):
+        call_command("sync_indexes", stdout=StringIO())
+        self.assertEqual(indexes.diff()["missing"], [])
+
+        out = StringIO()
+        call_command("sync_indexes", "--dry-run", stdout=out)
+        self.assertIn("0 missing", out.getvalue())
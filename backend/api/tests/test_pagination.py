@@ -0,0 +1,50 @@
+from django.urls import reverse
+from rest_framework import status
+
+from api import rollups
+from api.models import Item
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class CursorPaginationTestCase(BaseAPITestCase):
+    def _create_items(self, count):
+        for i in range(count):
+            item = Item(
+                name=f"Item {i}",
+                item_type="food",
+                item_location="first roof",
+                price=1.0 + i,
+            )
+            item.save()
+            rollups.attach_item(self.grocery1.uid, item.uid)
+
+    def test_cursor_walk_visits_every_item_once(self):
+        self._create_items(5)
+        url = reverse("item-list")
+
+        seen = []
+        resp = self.client.get(url, {"page_size": 2}, **self.admin_headers)
+        while True:
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(resp.data["results"]), 2)
+            seen.extend(i["uid"] for i in resp.data["results"])
+            if not resp.data["next"]:
+                break
+            resp = self.client.get(resp.data["next"], **self.admin_headers)
+
+        # five new items plus the one created in setUp
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+
+    def test_oversized_page_size_is_clamped(self):
+        self._create_items(3)
+        url = reverse("item-list")
+        resp = self.client.get(url, {"page_size": 10000}, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["results"]), 4)
+        self.assertIsNone(resp.data["next"])
+
+    def test_invalid_cursor_is_rejected(self):
+        url = reverse("item-list")
+        resp = self.client.get(url, {"cursor": "not-a-cursor"}, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
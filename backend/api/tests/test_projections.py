@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytz
+from django.urls import reverse
+from rest_framework import status
+
+from api import rollups
+from api.models import DailyIncome, Item
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class RelatedProjectionTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.item = Item(
+            name="Apples", item_type="food", item_location="first roof", price=2.0
+        )
+        self.item.save()
+        rollups.attach_item(self.grocery1.uid, self.item.uid)
+        self.supplier1.added_items.connect(self.item)
+
+    def test_item_list_and_detail_include_related_names(self):
+        list_resp = self.client.get(
+            reverse("item-list"),
+            {"grocery_id": self.grocery1.uid},
+            **self.admin_headers,
+        )
+        self.assertEqual(list_resp.status_code, status.HTTP_200_OK)
+        (row,) = list_resp.data["results"]
+        self.assertEqual(row["grocery_name"], self.grocery1.name)
+        self.assertEqual(row["added_by_name"], self.supplier1.name)
+
+        detail_resp = self.client.get(
+            reverse("item-detail", args=[self.item.uid]), **self.admin_headers
+        )
+        self.assertEqual(detail_resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(detail_resp.data["grocery_name"], self.grocery1.name)
+        self.assertEqual(detail_resp.data["added_by_name"], self.supplier1.name)
+
+    def test_missing_relationships_project_as_null(self):
+        resp = self.client.get(
+            reverse("item-detail", args=[self.other_item.uid]), **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["grocery_name"], self.grocery2.name)
+        self.assertIsNone(resp.data["added_by_name"])
+
+    def test_grocery_detail_aggregates(self):
+        deleted = Item(
+            name="Old Stock", item_type="food", item_location="first roof", price=1.0
+        )
+        deleted.save()
+        rollups.attach_item(self.grocery1.uid, deleted.uid)
+        deleted.soft_delete()
+
+        now = datetime.utcnow().replace(tzinfo=pytz.utc)
+        for days_ago, amount in [(1, 100.0), (400, 50.0)]:
+            income = DailyIncome(date=now - timedelta(days=days_ago), amount=amount)
+            income.save()
+            rollups.attach_income(self.grocery1.uid, income.uid)
+
+        resp = self.client.get(
+            reverse("grocery-detail", args=[self.grocery1.uid]), **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["items_count"], 1)
+        self.assertEqual(resp.data["total_income"], 150.0)
+        self.assertEqual(resp.data["total_income_30d"], 100.0)
+        self.assertEqual(resp.data["supplier_name"], self.supplier1.name)
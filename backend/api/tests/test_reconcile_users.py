@@ -0,0 +1,50 @@
+from io import StringIO
+
+from django.contrib.auth.models import Group, User as DjangoUser
+from django.core.management import call_command
+
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class ReconcileUsersTestCase(BaseAPITestCase):
+    def _reconcile(self, *args):
+        out = StringIO()
+        call_command("reconcile_users", "--batch-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_creates_updates_and_deactivates(self):
+        supplier_group, _ = Group.objects.get_or_create(name="Supplier")
+        stale = DjangoUser.objects.create_user(
+            "sup1@example.com", first_name="Old Name", is_staff=True
+        )
+        orphan = DjangoUser.objects.create_user("gone@example.com", is_staff=True)
+        orphan.groups.add(supplier_group)
+        superuser = DjangoUser.objects.create_superuser("admin", "a@example.com", "x")
+
+        self.supplier2.is_active = False
+        self.supplier2.save()
+
+        out = self._reconcile("--dry-run")
+        self.assertIn("2 created, 1 updated, 1 deactivated (dry run)", out)
+        self.assertFalse(DjangoUser.objects.filter(username="admin@example.com"))
+
+        out = self._reconcile()
+        self.assertIn("2 created, 1 updated, 1 deactivated", out)
+
+        admin = DjangoUser.objects.get(username="admin@example.com")
+        self.assertTrue(admin.is_superuser)
+        self.assertTrue(admin.check_password("adminpass123"))
+        self.assertEqual(list(admin.groups.values_list("name", flat=True)), ["Admin"])
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.first_name, "Supplier One")
+        self.assertFalse(stale.is_superuser)
+        self.assertTrue(stale.groups.filter(name="Supplier").exists())
+        self.assertFalse(DjangoUser.objects.get(username="sup2@example.com").is_active)
+
+        orphan.refresh_from_db()
+        self.assertFalse(orphan.is_active)
+        superuser.refresh_from_db()
+        self.assertTrue(superuser.is_active)
+
+        self.assertIn("0 created, 0 updated, 0 deactivated", self._reconcile())
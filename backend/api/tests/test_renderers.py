@@ -0,0 +1,41 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytz
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+    data = {
+        "name": "Caf\u00e9 \u2028 \U0001f34e",
+        "label": gettext_lazy("Name"),
+        "price": 12.5,
+        "ratio": 0.1,
+        "big": 1e15,
+        "count": 3,
+        "cost": Decimal("1.10"),
+        "date": datetime(2024, 2, 29, 12, tzinfo=pytz.utc),
+        "tags": [None, True, {"nested": -0.0}],
+    }
+
+    def _render(self, renderer, data):
+        return renderer().render(data, "application/json", {})
+
+    def test_same_bytes_as_json_renderer(self):
+        expected = self._render(JSONRenderer, self.data)
+        for fast in (False, True):
+            with override_settings(API_FAST_READS=fast):
+                self.assertEqual(self._render(ORJSONRenderer, self.data), expected)
+
+    @override_settings(API_FAST_READS=False)
+    def test_json_renderer_without_fast_reads(self):
+        data = {"small": 1e-7, "large": 1e16}
+        self.assertEqual(
+            self._render(ORJSONRenderer, data), self._render(JSONRenderer, data)
+        )
+        with self.assertRaises(ValueError):
+            self._render(ORJSONRenderer, {"amount": float("nan")})
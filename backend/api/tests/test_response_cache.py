@@ -0,0 +1,104 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User as DjangoUser
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+
+from api.cache import response_cache
+from api.models import Item
+from api.tests.test_requirements import BaseAPITestCase
+from api.transactions import atomic
+
+
+class ResponseCacheTestCase(BaseAPITestCase):
+    def _stats(self, endpoint):
+        return response_cache.stats([endpoint])["endpoints"][endpoint]
+
+    def test_repeated_read_is_served_from_cache(self):
+        url = reverse("grocery-detail", args=[self.grocery2.uid])
+        first = self.client.get(url, **self.admin_headers)
+        second = self.client.get(url, **self.admin_headers)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(
+            self._stats("grocery-detail"),
+            {"hits": 1, "misses": 1, "hit_ratio": 0.5},
+        )
+
+    def test_grocery_detail_is_cached_per_day(self):
+        url = reverse("grocery-detail", args=[self.grocery2.uid])
+        self.client.get(url, **self.admin_headers)
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch("api.views.timezone.now", return_value=tomorrow):
+            self.client.get(url, **self.admin_headers)
+        self.assertEqual(self._stats("grocery-detail")["misses"], 2)
+
+    def test_item_writes_invalidate_reads(self):
+        list_url = reverse("item-list")
+        grocery_url = reverse("grocery-detail", args=[self.grocery2.uid])
+        detail_url = reverse("item-detail", args=[self.other_item.uid])
+        self.client.get(list_url, **self.admin_headers)
+        self.client.get(grocery_url, **self.admin_headers)
+        self.client.get(detail_url, **self.admin_headers)
+
+        resp = self.client.put(
+            detail_url, {"name": "Go Board"}, format="json", **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        resp = self.client.get(detail_url, **self.admin_headers)
+        self.assertEqual(resp.data["name"], "Go Board")
+        resp = self.client.get(
+            list_url, {"grocery_id": self.grocery2.uid}, **self.admin_headers
+        )
+        self.assertEqual(resp.data["results"][0]["name"], "Go Board")
+
+        self.client.delete(detail_url, **self.admin_headers)
+        resp = self.client.get(list_url, **self.admin_headers)
+        self.assertEqual(resp.data["results"], [])
+        resp = self.client.get(grocery_url, **self.admin_headers)
+        self.assertEqual(resp.data["items_count"], 0)
+
+    def test_admin_item_edit_invalidates_reads(self):
+        list_url = reverse("item-list")
+        detail_url = reverse("item-detail", args=[self.other_item.uid])
+        self.client.get(list_url, **self.admin_headers)
+        self.client.get(detail_url, **self.admin_headers)
+
+        staff = DjangoUser.objects.create_user("staff", is_staff=True)
+        self.client.force_login(staff)
+        resp = self.client.post(
+            reverse("grocery_admin:neo4j_item_edit", args=[self.other_item.uid]),
+            {
+                "name": "Go Board",
+                "item_type": "game",
+                "item_location": "second roof",
+                "price": 35.0,
+            },
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.client.logout()
+
+        resp = self.client.get(detail_url, **self.admin_headers)
+        self.assertEqual((resp.data["name"], resp.data["price"]), ("Go Board", 35.0))
+        resp = self.client.get(list_url, **self.admin_headers)
+        self.assertEqual(resp.data["results"][0]["name"], "Go Board")
+
+    def test_rolled_back_writes_keep_cached_reads(self):
+        url = reverse("item-detail", args=[self.other_item.uid])
+        self.client.get(url, **self.admin_headers)
+        with self.assertRaises(RuntimeError):
+            with atomic():
+                Item.nodes.get(uid=self.other_item.uid).soft_delete()
+                raise RuntimeError
+        self.client.get(url, **self.admin_headers)
+        self.assertEqual(self._stats("item-detail")["hits"], 1)
+
+    def test_stats_are_admin_only(self):
+        url = reverse("cache_stats")
+        resp = self.client.get(url, **self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        resp = self.client.get(url, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("item-list", resp.data["endpoints"])
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytz
+from django.urls import reverse
+from rest_framework import status
+
+from api import rollups
+from api.models import DailyIncome
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class IncomeRollupTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for grocery, day, amount in [
+            (self.grocery1, datetime(2024, 3, 4, 9), 100.0),
+            (self.grocery1, datetime(2024, 3, 4, 18), 50.0),
+            (self.grocery1, datetime(2024, 3, 6, 12), 30.0),
+            (self.grocery2, datetime(2024, 3, 5, 12), 70.0),
+        ]:
+            income = DailyIncome(date=day.replace(tzinfo=pytz.utc), amount=amount)
+            income.save()
+            rollups.attach_income(grocery.uid, income.uid)
+        self.url = reverse("dailyincome-rollup")
+        self.window = {"from": "2024-03-01", "to": "2024-03-31"}
+
+    def test_daily_buckets_for_admin(self):
+        resp = self.client.get(self.url, self.window, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        by_day = {row["period"]: row for row in resp.data["results"]}
+        self.assertEqual(by_day["2024-03-04"]["total"], 150.0)
+        self.assertEqual(by_day["2024-03-04"]["count"], 2)
+        self.assertEqual(by_day["2024-03-04"]["max"], 100.0)
+        self.assertEqual(by_day["2024-03-05"]["total"], 70.0)
+
+    def test_weekly_buckets_are_scoped_for_supplier(self):
+        params = {**self.window, "bucket": "week", "group_by": "grocery"}
+        resp = self.client.get(self.url, params, **self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        (row,) = resp.data["results"]
+        self.assertEqual(row["period"], "2024-03-04")
+        self.assertEqual(row["grocery_id"], self.grocery1.uid)
+        self.assertEqual(row["total"], 180.0)
+        self.assertEqual(row["average"], 60.0)
+
+    def test_invalid_bucket_is_rejected(self):
+        resp = self.client.get(
+            self.url, {**self.window, "bucket": "year"}, **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_out_of_range_dates_are_rejected(self):
+        for params in (
+            {"to": "9999-12-31"},
+            {"from": "2024-03-05", "to": "2024-02-30"},
+        ):
+            resp = self.client.get(self.url, params, **self.admin_headers)
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+        resp = self.client.get(self.url, {"to": "0001-01-02"}, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["from"], "0001-01-01")
@@ -0,0 +1,49 @@
+from django.urls import reverse
+from rest_framework import status
+
+from api.queries import FORBIDDEN, NOT_FOUND, NodeQuery, fetch_scoped
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class ScopedFetchTestCase(BaseAPITestCase):
+    def _item_query(self, uid):
+        return NodeQuery(
+            "MATCH (n:Item {uid: $uid})",
+            where=["n.is_deleted = false"],
+            params={"uid": uid},
+        )
+
+    def test_outcomes(self):
+        query = self._item_query(self.other_item.uid)
+
+        item, denied = fetch_scoped(query, "HAS_ITEM")
+        self.assertEqual(item.uid, self.other_item.uid)
+        self.assertIsNone(denied)
+
+        item, denied = fetch_scoped(query, "HAS_ITEM", self.supplier1.uid)
+        self.assertIsNone(item)
+        self.assertEqual(denied, FORBIDDEN)
+
+        item, denied = fetch_scoped(
+            self._item_query("missing"), "HAS_ITEM", self.supplier1.uid
+        )
+        self.assertIsNone(item)
+        self.assertEqual(denied, NOT_FOUND)
+
+    def test_missing_item_is_not_found_for_suppliers(self):
+        detail_url = reverse("item-detail", args=["missing"])
+        response = self.client.put(
+            detail_url, {"price": 3.0}, format="json", **self.supplier1_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.delete(detail_url, **self.supplier1_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_admin_can_update_any_item(self):
+        detail_url = reverse("item-detail", args=[self.other_item.uid])
+        response = self.client.put(
+            detail_url, {"price": 35.0}, format="json", **self.admin_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["price"], 35.0)
@@ -0,0 +1,77 @@
+from django.urls import reverse
+from rest_framework import status
+
+from api import indexes
+from api.models import Item
+from api.tests.test_requirements import BaseAPITestCase
+from api import rollups
+
+
+class SearchTestCase(BaseAPITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        search_indexes = [
+            index for index in indexes.INDEXES if index.kind == "FULLTEXT"
+        ]
+        for index in search_indexes:
+            indexes.create(index)
+        indexes.await_online([index.name for index in search_indexes], 60)
+
+    def setUp(self):
+        super().setUp()
+        for name in ("Chess Clock", "Chessboard Mat", "Dice"):
+            item = Item(name=name, item_type="game", item_location="aisle 3", price=5.0)
+            item.save()
+            rollups.attach_item(self.grocery1.uid, item.uid)
+
+    def _search(self, headers, **params):
+        resp = self.client.get(reverse("search"), params, **headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.data
+
+    def test_ranked_prefix_matches(self):
+        data = self._search(self.admin_headers, q="chess")
+        names = [row["data"]["name"] for row in data["results"]]
+        self.assertEqual(
+            sorted(names), ["Chess Board", "Chess Clock", "Chessboard Mat"]
+        )
+        scores = [row["score"] for row in data["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        grocery_names = {
+            row["data"]["name"]: row["data"]["grocery_name"] for row in data["results"]
+        }
+        self.assertEqual(grocery_names["Chess Board"], "Daily Goods")
+        self.assertEqual(grocery_names["Chess Clock"], "Fresh Mart")
+
+    def test_pages_follow_cursor(self):
+        data = self._search(self.admin_headers, q="chess", page_size=2)
+        self.assertEqual(len(data["results"]), 2)
+        rest = self.client.get(data["next"], **self.admin_headers).data
+        uids = {row["uid"] for row in data["results"] + rest["results"]}
+        self.assertEqual(len(uids), 3)
+        self.assertIsNone(rest["next"])
+
+    def test_scoping(self):
+        data = self._search(self.admin_headers, q="chess", grocery_id=self.grocery2.uid)
+        self.assertEqual([row["uid"] for row in data["results"]], [self.other_item.uid])
+
+        data = self._search(self.admin_headers, q="supplier", type="user")
+        self.assertEqual(len(data["results"]), 2)
+
+        resp = self.client.get(
+            reverse("search"),
+            {"q": "supplier", "type": "user"},
+            **self.supplier1_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleted_items_and_special_characters(self):
+        self.client.delete(
+            reverse("item-detail", args=[self.other_item.uid]), **self.admin_headers
+        )
+        data = self._search(self.admin_headers, q='chess board" (')
+        self.assertEqual(data["results"], [])
+
+        resp = self.client.get(reverse("search"), {"q": " "}, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
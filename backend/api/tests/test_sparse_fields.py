@@ -0,0 +1,35 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class SparseFieldsTestCase(BaseAPITestCase):
+    def test_fields_trims_list_rows(self):
+        url = reverse("item-list")
+        for fast in (False, True):
+            with override_settings(API_FAST_READS=fast, API_CACHE_ENABLED=False):
+                resp = self.client.get(
+                    url, {"fields": "uid,name,unknown"}, **self.admin_headers
+                )
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                resp.data["results"],
+                [{"uid": self.other_item.uid, "name": "Chess Board"}],
+            )
+
+    def test_exclude_skips_grocery_aggregates(self):
+        url = reverse("grocery-detail", args=[self.grocery2.uid])
+        resp = self.client.get(
+            url, {"exclude": "total_income_30d,total_income_ytd"}, **self.admin_headers
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotIn("total_income_30d", resp.data)
+        self.assertNotIn("total_income_ytd", resp.data)
+        self.assertEqual(resp.data["items_count"], 1)
+
+    def test_fields_on_retrieve(self):
+        url = reverse("item-detail", args=[self.other_item.uid])
+        resp = self.client.get(url, {"fields": "grocery_name"}, **self.admin_headers)
+        self.assertEqual(resp.data, {"grocery_name": "Daily Goods"})
@@ -0,0 +1,39 @@
+from django.test import override_settings
+
+from api import stats
+from api.models import Item
+from api.tests.test_requirements import BaseAPITestCase
+from api import rollups
+
+
+class StatsTestCase(BaseAPITestCase):
+    def test_counts(self):
+        deleted = Item(
+            name="Old Stock", item_type="food", item_location="aisle 1", price=1.0
+        )
+        deleted.save()
+        rollups.attach_item(self.grocery1.uid, deleted.uid)
+        deleted.soft_delete()
+
+        report = stats.collect()
+        self.assertEqual(report["stats"]["Admins"], 1)
+        self.assertEqual(report["stats"]["Suppliers"], 2)
+        self.assertEqual(report["stats"]["Groceries"], 2)
+        self.assertEqual(report["items"], {"active": 1, "deleted": 1})
+        self.assertEqual(report["relationships"]["HAS_ITEM"], 2)
+        self.assertEqual(report["relationships"]["RESPONSIBLE_FOR"], 1)
+        self.assertEqual(
+            [(g["name"], g["items"]) for g in report["top_groceries"]],
+            [("Daily Goods", 1), ("Fresh Mart", 1)],
+        )
+
+    @override_settings(NEO4J_STATS_TIMEOUT=60)
+    def test_report_is_cached(self):
+        first = stats.get()
+        Item(
+            name="New Stock", item_type="food", item_location="aisle 1", price=1.0
+        ).save()
+        self.assertEqual(stats.get(), first)
+        self.assertEqual(
+            stats.get(refresh=True)["stats"]["Items"], first["stats"]["Items"] + 1
+        )
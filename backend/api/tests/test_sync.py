@@ -0,0 +1,70 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from api.tests.test_requirements import BaseAPITestCase
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncFeedTestCase(BaseAPITestCase):
+    def _sync(self, headers, **params):
+        resp = self.client.get(reverse("sync"), params, **headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.data
+
+    def _drain(self, headers, **params):
+        changes = []
+        while True:
+            data = self._sync(headers, page_size=2, **params)
+            changes += data["changes"]
+            params["since"] = data["cursor"]
+            if not data["has_more"]:
+                return changes, data["cursor"]
+
+    def test_initial_sync_pages_through_everything(self):
+        changes, cursor = self._drain(self.admin_headers)
+        kinds = sorted(change["type"] for change in changes)
+        self.assertEqual(kinds, ["grocery"] * 2 + ["item"] + ["user"] * 3)
+        self.assertEqual(len({change["uid"] for change in changes}), 6)
+
+        data = self._sync(self.admin_headers, since=cursor)
+        self.assertEqual(data["changes"], [])
+        self.assertEqual(data["cursor"], cursor)
+
+    def test_changes_and_tombstones_after_cursor(self):
+        _, cursor = self._drain(self.admin_headers)
+
+        detail_url = reverse("item-detail", args=[self.other_item.uid])
+        self.client.put(
+            detail_url, {"price": 12.0}, format="json", **self.admin_headers
+        )
+        data = self._sync(self.admin_headers, since=cursor)
+        self.assertEqual(len(data["changes"]), 1)
+        self.assertEqual(data["changes"][0]["data"]["price"], 12.0)
+
+        self.client.delete(detail_url, **self.admin_headers)
+        data = self._sync(self.admin_headers, since=data["cursor"])
+        self.assertEqual(
+            data["changes"],
+            [
+                {
+                    "type": "item",
+                    "uid": self.other_item.uid,
+                    "deleted": True,
+                    "data": None,
+                }
+            ],
+        )
+
+    def test_suppliers_sync_their_grocery_only(self):
+        changes, _ = self._drain(self.supplier1_headers)
+        self.assertEqual(
+            [(c["type"], c["uid"]) for c in changes], [("grocery", self.grocery1.uid)]
+        )
+
+        resp = self.client.get(reverse("sync"), **self.supplier2_headers)
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_cursor(self):
+        resp = self.client.get(reverse("sync"), {"since": "nope"}, **self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
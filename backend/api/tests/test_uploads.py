@@ -0,0 +1,69 @@
+from django.urls import reverse
+from rest_framework import status
+
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class IncomeUploadTestCase(BaseAPITestCase):
+    url = reverse("dailyincome-upload")
+
+    def _upload(self, body, content_type, headers, **params):
+        url = self.url
+        if params:
+            url += "?" + "&".join(f"{k}={v}" for k, v in params.items())
+        return self.client.generic(
+            "POST", url, body.encode("utf-8"), content_type=content_type, **headers
+        )
+
+    def test_csv_upload_upserts_on_day(self):
+        body = (
+            "date,amount\n"
+            "2024-01-01,10\n"
+            "2024-01-02,20\n"
+            "2024-01-02T15:00:00Z,25\n"
+            "not-a-date,5\n"
+        )
+        resp = self._upload(body, "text/csv", self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["rows"], 4)
+        self.assertEqual(resp.data["created"], 2)
+        self.assertEqual(resp.data["updated"], 1)
+        self.assertEqual(resp.data["invalid"], 1)
+        self.assertEqual(resp.data["errors"][0]["line"], 5)
+
+        body = "date,amount\n2024-01-01,12\n"
+        resp = self._upload(body, "text/csv", self.supplier1_headers)
+        self.assertEqual(resp.data["updated"], 1)
+
+        detail = self.client.get(
+            reverse("grocery-detail", args=[self.grocery1.uid]), **self.admin_headers
+        )
+        self.assertEqual(detail.data["total_income"], 37.0)
+
+    def test_impossible_dates_are_row_errors(self):
+        body = "date,amount\n2024-02-30,10\n2024-13-01,10\n2024-02-29,10\n"
+        resp = self._upload(body, "text/csv", self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["created"], 1)
+        self.assertEqual(resp.data["invalid"], 2)
+        self.assertEqual([error["line"] for error in resp.data["errors"]], [2, 3])
+        self.assertEqual(resp.data["errors"][0]["errors"], {"date": ["Invalid date."]})
+
+    def test_admin_ndjson_upload_requires_grocery(self):
+        body = '{"date": "2024-02-01", "amount": 4}\n{"amount": 1}\n'
+        resp = self._upload(body, "application/x-ndjson", self.admin_headers)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        resp = self._upload(
+            body,
+            "application/x-ndjson",
+            self.admin_headers,
+            grocery_id=self.grocery2.uid,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["created"], 1)
+        self.assertEqual(resp.data["invalid"], 1)
+
+    def test_unsupported_content_type(self):
+        resp = self._upload("{}", "application/json", self.supplier1_headers)
+        self.assertEqual(resp.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
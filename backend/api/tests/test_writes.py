@@ -0,0 +1,45 @@
+from django.urls import reverse
+from neomodel import db
+from rest_framework import status
+
+from api.models import Supplier
+from api.tests.test_requirements import BaseAPITestCase
+
+
+class AssignSupplierTestCase(BaseAPITestCase):
+    def _assignments(self, supplier):
+        results, _ = db.cypher_query(
+            "MATCH (:Supplier {uid: $uid})-[:RESPONSIBLE_FOR]->(g) RETURN g.uid",
+            {"uid": supplier.uid},
+        )
+        return [row[0] for row in results]
+
+    def test_reassignment_replaces_previous_grocery(self):
+        url = reverse("grocery-assign-supplier", args=[self.grocery2.uid])
+        resp = self.client.post(
+            url,
+            {"supplier_id": self.supplier1.uid},
+            format="json",
+            **self.admin_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._assignments(self.supplier1), [self.grocery2.uid])
+
+    def test_inactive_supplier_is_not_assigned(self):
+        self.supplier2.is_active = False
+        self.supplier2.save()
+
+        url = reverse("grocery-assign-supplier", args=[self.grocery2.uid])
+        resp = self.client.post(
+            url,
+            {"supplier_id": self.supplier2.uid},
+            format="json",
+            **self.admin_headers,
+        )
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._assignments(self.supplier2), [])
+
+    def test_assign_grocery_reports_missing_nodes(self):
+        self.assertFalse(Supplier.assign_grocery(self.supplier2.uid, "missing"))
+        self.assertTrue(Supplier.assign_grocery(self.supplier2.uid, self.grocery2.uid))
+        self.assertEqual(self._assignments(self.supplier2), [self.grocery2.uid])
@@ -0,0 +1,41 @@
+import threading
+from contextlib import contextmanager
+
+from neomodel import db
+
+
+_state = threading.local()
+
+
+@contextmanager
+def atomic():
+    """Run the block in one Neo4j write transaction.
+
+    neomodel's ``db.transaction`` refuses to nest, so a block entered while a
+    transaction is already open simply joins it; the outermost ``atomic()``
+    commits or rolls back everything.
+    """
+    if getattr(db, "_active_transaction", None) is not None:
+        yield
+        return
+
+    _state.callbacks = []
+    try:
+        with db.write_transaction:
+            yield
+        callbacks = _state.callbacks
+    finally:
+        _state.callbacks = None
+    for callback in callbacks:
+        callback()
+
+
+def on_commit(callback):
+    """Call ``callback`` once the enclosing ``atomic()`` block has committed,
+    or right away outside of one. Callbacks of a rolled back block are
+    dropped."""
+    callbacks = getattr(_state, "callbacks", None)
+    if callbacks is None or getattr(db, "_active_transaction", None) is None:
+        callback()
+    else:
+        callbacks.append(callback)
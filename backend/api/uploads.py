@@ -0,0 +1,197 @@
+"""Streaming import of historical daily income.
+
+The request body is read line by line and written in ``CHUNK_SIZE`` batches,
+so memory use does not depend on the size of the upload. Rows are upserted
+on (grocery, UTC day): a row for a day that already has an income updates
+that income (the earliest one, if there are several) instead of adding a
+second. Counters and day totals from :mod:`api.rollups` are adjusted in the
+same statement.
+"""
+
+import csv
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytz
+from django.utils.dateparse import parse_date
+from neomodel import db
+
+from .cache import incomes_changed
+from .models import DailyIncome
+from .serializers import DailyIncomeSerializer
+
+
+CHUNK_SIZE = 1000
+MAX_ERRORS = 100
+FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+INCOME_LABELS = ":".join(DailyIncome.inherited_labels())
+
+
+class UploadSummary:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.invalid = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "errors_truncated": self.invalid > len(self.errors),
+        }
+
+
+def upload_format(content_type):
+    return FORMATS.get((content_type or "").split(";")[0].strip().lower())
+
+
+def import_incomes(stream, fmt, grocery_uid, supplier_uid=None, chunk_size=CHUNK_SIZE):
+    """Validate and upsert every row of ``stream`` into ``grocery_uid``."""
+    summary = UploadSummary()
+    chunk = {}
+    superseded = 0
+
+    for line, record in _records(stream, fmt):
+        summary.rows += 1
+        if isinstance(record, str):
+            summary.add_error(line, {"non_field_errors": [record]})
+            continue
+
+        row = _validate(record)
+        if "errors" in row:
+            summary.add_error(line, row["errors"])
+            continue
+
+        # A later row for the same day overwrites an earlier one, exactly as
+        # if the two had been written one after the other.
+        if row["day"] in chunk:
+            superseded += 1
+        chunk[row["day"]] = row
+        if len(chunk) >= chunk_size:
+            _write(grocery_uid, supplier_uid, list(chunk.values()), summary)
+            chunk = {}
+
+    if chunk:
+        _write(grocery_uid, supplier_uid, list(chunk.values()), summary)
+    summary.updated += superseded
+    return summary
+
+
+def _records(stream, fmt):
+    """Yield ``(line_number, record)``; a string record is a parse error."""
+    lines = (raw.decode("utf-8-sig", errors="replace") for raw in stream)
+
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for number, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            yield number, "Invalid JSON"
+            continue
+        yield number, record if isinstance(record, dict) else "Expected an object"
+
+
+def _validate(record):
+    data = dict(record)
+    # CSV exports usually carry plain dates; treat them as UTC midnight.
+    if isinstance(data.get("date"), str):
+        try:
+            plain_date = parse_date(data["date"].strip())
+        except ValueError:
+            # Well formed but impossible, e.g. 2024-02-30
+            return {"errors": {"date": ["Invalid date."]}}
+        if plain_date:
+            data["date"] = data["date"].strip() + "T00:00:00Z"
+
+    serializer = DailyIncomeSerializer(data=data)
+    if not serializer.is_valid():
+        return {"errors": serializer.errors}
+
+    moment = serializer.validated_data["date"]
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=pytz.utc)
+    moment = moment.astimezone(pytz.utc)
+    day_start = datetime.combine(moment.date(), datetime.min.time(), tzinfo=pytz.utc)
+    return {
+        "uid": uuid.uuid4().hex,
+        "day": moment.date().isoformat(),
+        "day_start": day_start.timestamp(),
+        "day_end": (day_start + timedelta(days=1)).timestamp(),
+        "date": moment.timestamp(),
+        "amount": serializer.validated_data["amount"],
+    }
+
+
+def _write(grocery_uid, supplier_uid, rows, summary):
+    results, _ = db.cypher_query(
+        f"""
+        MATCH (g:Grocery {{uid: $grocery_uid}})
+        OPTIONAL MATCH (s:Supplier {{uid: $supplier_uid}})
+        UNWIND $rows AS row
+        CALL {{
+            WITH g, row
+            OPTIONAL MATCH (g)-[:HAS_INCOME]->(d:DailyIncome)
+            WHERE d.date >= row.day_start AND d.date < row.day_end
+            WITH d ORDER BY d.created_at LIMIT 1
+            RETURN d AS existing
+        }}
+        WITH g, s, row, existing, coalesce(existing.amount, 0.0) AS previous
+        FOREACH (_ IN CASE WHEN existing IS NULL THEN [1] ELSE [] END |
+            CREATE (g)-[:HAS_INCOME]->(d:{INCOME_LABELS} {{
+                uid: row.uid, date: row.date, amount: row.amount,
+                created_at: $now, updated_at: $now
+            }})
+            FOREACH (__ IN CASE WHEN s IS NULL THEN [] ELSE [1] END |
+                CREATE (s)-[:RECORDED_INCOME]->(d)))
+        FOREACH (_ IN CASE WHEN existing IS NULL THEN [] ELSE [1] END |
+            SET existing.date = row.date, existing.amount = row.amount,
+                existing.updated_at = $now)
+        WITH g, row, existing, previous
+        CALL {{
+            WITH g, row, existing, previous
+            WITH * WHERE g.income_total IS NOT NULL
+            SET g.income_total = g.income_total + row.amount - previous
+            MERGE (g)-[:HAS_DAY_TOTAL]->(t:DailyTotal {{day: row.day}})
+              ON CREATE SET t.total = 0.0, t.count = 0
+            SET t.total = t.total + row.amount - previous,
+                t.count = t.count + CASE WHEN existing IS NULL THEN 1 ELSE 0 END
+        }}
+        RETURN count(CASE WHEN existing IS NULL THEN 1 END) AS created,
+               count(existing) AS updated
+        """,
+        {
+            "grocery_uid": grocery_uid,
+            "supplier_uid": supplier_uid,
+            "rows": rows,
+            "now": time.time(),
+        },
+    )
+    created, updated = results[0] if results else (0, 0)
+    summary.created += created
+    summary.updated += updated
+    if created or updated:
+        incomes_changed(grocery_uid)
@@ -13,5 +13,8 @@ urlpatterns = [
     path("auth/register/supplier/", views.register_supplier, name="register_supplier"),
     path("auth/login/", views.login, name="login"),
     path("auth/profile/", views.profile, name="profile"),
+    path("cache/stats/", views.cache_stats, name="cache_stats"),
+    path("sync/", views.sync_changes, name="sync"),
+    path("search/", views.full_text_search, name="search"),
     path("", include(router.urls)),
 ]
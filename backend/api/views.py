@@ -1,11 +1,22 @@
+import hashlib
+from datetime import date, timedelta
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date, quote_etag
 from rest_framework import status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+    throttle_classes,
+)
 from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from rest_framework.pagination import PageNumberPagination
 
-from .models import Admin, Supplier, Grocery, Item, DailyIncome, User
+from .models import Admin, Supplier, Grocery, User
 from .serializers import (
     AdminRegistrationSerializer,
     SupplierRegistrationSerializer,
@@ -15,6 +26,7 @@ from .serializers import (
     ItemSerializer,
     DailyIncomeSerializer,
     GroceryDetailSerializer,
+    select_fields,
 )
 from .permissions import (
     IsAdmin,
@@ -22,13 +34,125 @@ from .permissions import (
     IsSupplierOwnerOrAdmin,
     CanReadItems,
 )
-from .authentication import create_jwt_token
+from . import batch, exports, filters, plans, rollups, search, sync, uploads
+from .authentication import (
+    create_jwt_token,
+    get_supplier_grocery_uid,
+    invalidate_user,
+)
+from .cache import CACHED_ENDPOINTS, items_changed, response_cache
+from .pagination import StandardResultsSetPagination, SyncPagination
+from .transactions import atomic
+from .queries import (
+    FORBIDDEN,
+    NodeQuery,
+    ROLLUP_BUCKETS,
+    fetch_scoped,
+    income_rollup,
+    pick,
+    GROCERY_RELATED,
+    GROCERY_TOTALS,
+    ITEM_RELATED,
+    INCOME_RELATED,
+)
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = "page_size"
-    max_page_size = 100
+def supplier_scope(request):
+    """Uid to scope ownership checks by: the caller's uid for suppliers,
+    ``None`` for admins."""
+    if request.neo4j_user_type == "supplier":
+        return request.user.pk
+    return None
+
+
+def paginated_list(
+    request, paginator, query, serializer_class, plan, ordering=("created_at", False)
+):
+    """Page ``query`` and render it with ``serializer_class``, or from
+    projected records through ``plan`` when ``API_FAST_READS`` is on.
+
+    Honours ``?fields=`` / ``?exclude=``: projections for fields that are not
+    rendered are dropped from the query.
+    """
+    fields = select_fields(request, serializer_class)
+    if plans.fast_reads_enabled():
+        plan = plan.only(fields)
+        records = paginator.paginate_query(plan.query(query), request, ordering)
+        return paginator.get_paginated_response(plan.render(records))
+
+    nodes = paginator.paginate_query(query.only(fields), request, ordering)
+    serializer = serializer_class(nodes, many=True, fields=fields)
+    return paginator.get_paginated_response(serializer.data)
+
+
+def conditional_get(request, scopes, build, vary="", endpoint=None):
+    """Serve ``build()`` with an ETag and Last-Modified taken from the
+    response-cache versions of ``scopes``, or a 304 if the client's
+    ``If-None-Match`` / ``If-Modified-Since`` still matches.
+
+    Writes bump the versions a read depends on (see api.cache), so the
+    check costs one cache read and no Neo4j query. With ``endpoint`` the
+    body is served through ``response_cache`` under the same versions.
+    Only a shared cache backend sees the bumps of every worker process and
+    management command, so with a per-process one no validators are sent.
+
+    The ETag covers the full URL, so each page, cursor and sparse fieldset
+    gets its own; ``vary`` adds what else the body depends on. Last-Modified
+    only has one-second resolution; clients should prefer the ETag.
+    Responses are marked ``no-cache`` so browsers revalidate on every poll
+    instead of guessing a freshness lifetime from Last-Modified.
+    """
+    if not response_cache.shared:
+        if endpoint is None:
+            return build()
+        return response_cache.respond(request, endpoint, scopes, build, vary)
+
+    versions = response_cache.versions(scopes)
+    etag = quote_etag(
+        hashlib.sha1(
+            "\n".join(
+                [
+                    request.get_full_path(),
+                    str(request.accepted_media_type),
+                    str(vary),
+                    *versions,
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+    )
+    modified = response_cache.changed_at(versions)
+    last_modified = int(modified) if modified is not None else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if endpoint is None:
+            response = build()
+        else:
+            response = response_cache.respond(
+                request, endpoint, scopes, build, vary, versions=versions
+            )
+        if response.status_code != status.HTTP_200_OK:
+            return response
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def export_format(request):
+    """Validate ``?output=`` for export actions.
+
+    Returns ``(format, error_response)``. ``?format=`` is left alone since DRF
+    reserves it for renderer selection.
+    """
+    fmt = request.query_params.get("output", "ndjson")
+    if fmt not in exports.EXPORT_FORMATS:
+        return None, Response(
+            {"error": f"output must be one of: {', '.join(exports.EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return fmt, None
 
 
 @api_view(["POST"])
@@ -108,26 +232,118 @@ def profile(request):
     return Response({"user": user_data})
 
 
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    """Hit/miss counters of the cached read endpoints"""
+    return Response(response_cache.stats(CACHED_ENDPOINTS))
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSupplier])
+def sync_changes(request):
+    """Entities created, updated or soft-deleted after ``?since=``.
+
+    Pass the returned ``cursor`` as ``since`` on the next call; keep calling
+    while ``has_more`` is true. Suppliers get their grocery, its items and
+    its incomes; admins get everything, or one grocery with ``?grocery_id=``.
+    """
+    paginator = SyncPagination()
+    since = paginator.decode_cursor(request) or (0.0, "")
+
+    if isinstance(request.neo4j_user, Supplier):
+        grocery_uid = get_supplier_grocery_uid(request)
+        if not grocery_uid:
+            return Response(
+                {"error": "No grocery assigned"}, status=status.HTTP_403_FORBIDDEN
+            )
+    else:
+        grocery_uid = request.query_params.get("grocery_id") or None
+        # Deactivated groceries still sync, so their tombstone reaches clients
+        if grocery_uid and not Grocery.nodes.get_or_none(uid=grocery_uid):
+            return Response(
+                {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+    rows, last_key, has_more = sync.changes(
+        since, paginator.get_page_size(request), grocery_uid=grocery_uid
+    )
+    return Response(
+        {
+            "cursor": paginator.encode_cursor(*last_key),
+            "has_more": has_more,
+            "changes": rows,
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSupplier])
+def full_text_search(request):
+    """Items, groceries and, for admins, users matching ``?q=``, best first.
+
+    ``?type=item,grocery`` narrows the kinds searched and ``?grocery_id=``
+    limits items and groceries to one grocery. Suppliers see what the item
+    and grocery lists show them.
+    """
+    text = request.query_params.get("q", "").strip()
+    if not text:
+        return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    allowed = list(search.TARGETS)
+    if not isinstance(request.neo4j_user, Admin):
+        allowed.remove("user")
+    kinds = request.query_params.get("type")
+    if kinds:
+        kinds = [kind.strip() for kind in kinds.split(",") if kind.strip()]
+        if not kinds or set(kinds) - set(allowed):
+            return Response(
+                {"error": f"type must be among: {', '.join(allowed)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    else:
+        kinds = allowed
+
+    paginator = StandardResultsSetPagination()
+    rows, next_key = search.search(
+        text,
+        kinds,
+        paginator.get_page_size(request),
+        after=paginator.decode_cursor(request),
+        grocery_uid=request.query_params.get("grocery_id") or None,
+    )
+    return paginator.get_keyed_response(request, rows, next_key)
+
+
 class UserViewSet(viewsets.ViewSet):
     permission_classes = [IsAdmin]
     pagination_class = StandardResultsSetPagination
 
     def list(self, request):
         """List all users"""
-        users = User.nodes.all()
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        return paginated_list(
+            request,
+            self.pagination_class(),
+            NodeQuery("MATCH (n:User)"),
+            UserSerializer,
+            plans.USER_PLAN,
+        )
 
     def retrieve(self, request, pk=None):
         """Get specific user"""
-        try:
-            user = User.nodes.get(uid=pk)
-            serializer = UserSerializer(user)
-            return Response(serializer.data)
-        except User.DoesNotExist:
-            return Response(
-                {"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
-            )
+
+        def build():
+            try:
+                user = User.nodes.get(uid=pk)
+                fields = select_fields(request, UserSerializer)
+                serializer = UserSerializer(user, fields=fields)
+                return Response(serializer.data)
+            except User.DoesNotExist:
+                return Response(
+                    {"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+
+        return response_cache.respond(request, "user-detail", [f"user:{pk}"], build)
 
     def update(self, request, pk=None):
         try:
@@ -140,6 +356,7 @@ class UserViewSet(viewsets.ViewSet):
                     "is_active", user.is_active
                 )
                 user.save()
+                invalidate_user(user.uid)
                 return Response(UserSerializer(user).data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except User.DoesNotExist:
@@ -153,6 +370,7 @@ class UserViewSet(viewsets.ViewSet):
             user = User.nodes.get(uid=pk)
             user.is_active = False
             user.save()
+            invalidate_user(user.uid)
             return Response({"message": "User deactivated successfully"})
         except User.DoesNotExist:
             return Response(
@@ -166,35 +384,60 @@ class GroceryViewSet(viewsets.ViewSet):
 
     def list(self, request):
         """List groceries"""
-        neo4j_user = request.neo4j_user
+        paginator = self.pagination_class()
+        query = NodeQuery(
+            "MATCH (n:Grocery)",
+            where=["n.is_active = true"],
+            projections=GROCERY_RELATED,
+        )
+        return conditional_get(
+            request,
+            ["groceries", "users", "assignments"],
+            lambda: paginated_list(
+                request, paginator, query, GrocerySerializer, plans.GROCERY_PLAN
+            ),
+            endpoint="grocery-list",
+        )
 
-        if isinstance(neo4j_user, Admin):
-            groceries = Grocery.nodes.filter(is_active=True)
+    def retrieve(self, request, pk=None):
+        neo4j_user = request.neo4j_user
+        if isinstance(neo4j_user, Supplier):
+            detailed = get_supplier_grocery_uid(request) == pk
         else:
-            groceries = Grocery.nodes.filter(is_active=True)
+            detailed = True
 
-        serializer = GrocerySerializer(groceries, many=True)
-        return Response(serializer.data)
+        serializer_class = GroceryDetailSerializer if detailed else GrocerySerializer
+        fields = select_fields(request, serializer_class)
 
-    def retrieve(self, request, pk=None):
-        try:
-            grocery = Grocery.nodes.get(uid=pk, is_active=True)
-            neo4j_user = request.neo4j_user
-
-            if isinstance(neo4j_user, Supplier):
-                supplier_grocery = neo4j_user.responsible_for.single()
-                if supplier_grocery and supplier_grocery.uid == grocery.uid:
-                    serializer = GroceryDetailSerializer(grocery)
-                else:
-                    serializer = GrocerySerializer(grocery)
-            else:
-                serializer = GroceryDetailSerializer(grocery)
-
-            return Response(serializer.data)
-        except Grocery.DoesNotExist:
-            return Response(
-                {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
+        def build():
+            query = NodeQuery(
+                "MATCH (n:Grocery {uid: $uid})",
+                where=["n.is_active = true"],
+                params={"uid": pk},
+                projections=GROCERY_RELATED,
             )
+            if detailed:
+                query = query.project(**GROCERY_TOTALS)
+            query = query.only(fields)
+
+            grocery = query.first()
+            if grocery is None:
+                return Response(
+                    {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+
+            return Response(serializer_class(grocery, fields=fields).data)
+
+        # The 30-day and year-to-date totals of detailed reads move with the
+        # (UTC) date as well as with writes
+        day = timezone.now().date().isoformat() if detailed else ""
+        return conditional_get(
+            request,
+            [f"grocery:{pk}", "users", "assignments"],
+            build,
+            vary=f"{detailed}:{day}",
+            endpoint="grocery-detail",
+        )
 
     def create(self, request):
         if not isinstance(request.neo4j_user, Admin):
@@ -205,8 +448,9 @@ class GroceryViewSet(viewsets.ViewSet):
 
         serializer = GrocerySerializer(data=request.data)
         if serializer.is_valid():
-            grocery = serializer.save()
-            request.neo4j_user.manages_groceries.connect(grocery)
+            with atomic():
+                grocery = serializer.save()
+                request.neo4j_user.manages_groceries.connect(grocery)
             return Response(
                 GrocerySerializer(grocery).data, status=status.HTTP_201_CREATED
             )
@@ -250,63 +494,117 @@ class GroceryViewSet(viewsets.ViewSet):
 
     @action(detail=True, methods=["post"], permission_classes=[IsAdmin])
     def assign_supplier(self, request, pk=None):
-        try:
-            grocery = Grocery.nodes.get(uid=pk, is_active=True)
-            supplier_id = request.data.get("supplier_id")
-
-            if not supplier_id:
-                return Response(
-                    {"error": "supplier_id is required"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            supplier = Supplier.nodes.get(uid=supplier_id, is_active=True)
-
-            existing_connection = supplier.responsible_for.single()
-            if existing_connection:
-                supplier.responsible_for.disconnect(existing_connection)
+        supplier_id = request.data.get("supplier_id")
 
-            supplier.responsible_for.connect(grocery)
+        if not supplier_id:
+            return Response(
+                {"error": "supplier_id is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            return Response({"message": "Supplier assigned successfully"})
-        except (Grocery.DoesNotExist, Supplier.DoesNotExist):
+        if not Supplier.assign_grocery(supplier_id, pk, active_only=True):
             return Response(
                 {"error": "Grocery or Supplier not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        invalidate_user(supplier_id)
+        return Response({"message": "Supplier assigned successfully"})
+
 
 class ItemViewSet(viewsets.ViewSet):
     permission_classes = [CanReadItems]
     pagination_class = StandardResultsSetPagination
 
-    def list(self, request):
+    def _list_query(self, request):
+        """Query for the live items ``list`` and ``export`` return, narrowed
+        by the filters in ``filters.ITEM_FILTERS``.
+
+        Returns ``(query, error_response)``.
+        """
         grocery_id = request.query_params.get("grocery_id")
 
         if grocery_id:
             try:
-                grocery = Grocery.nodes.get(uid=grocery_id, is_active=True)
-                items = grocery.items.filter(is_deleted=False)
+                Grocery.nodes.get(uid=grocery_id, is_active=True)
             except Grocery.DoesNotExist:
-                return Response(
+                return None, Response(
                     {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
                 )
+            query = NodeQuery(
+                "MATCH (:Grocery {uid: $grocery_id})-[:HAS_ITEM]->(n:Item)",
+                params={"grocery_id": grocery_id},
+            )
         else:
-            items = Item.nodes.filter(is_deleted=False)
+            query = NodeQuery("MATCH (n:Item)")
 
-        serializer = ItemSerializer(items, many=True)
-        return Response(serializer.data)
+        query, errors = filters.ITEM_FILTERS.apply(query, request.query_params)
+        if errors:
+            return None, Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return query.filter("n.is_deleted = false").project(**ITEM_RELATED), None
 
-    def retrieve(self, request, pk=None):
-        try:
-            item = Item.nodes.get(uid=pk, is_deleted=False)
-            serializer = ItemSerializer(item)
-            return Response(serializer.data)
-        except Item.DoesNotExist:
+    def list(self, request):
+        query, error = self._list_query(request)
+        if error:
+            return error
+        ordering = filters.ITEM_FILTERS.ordering(request.query_params)
+        if ordering is None:
             return Response(
-                {"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND
+                {
+                    "error": "ordering must be one of: "
+                    f"{', '.join(filters.ITEM_FILTERS.orderings)}, "
+                    "prefixed with - for descending"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
+        grocery_id = request.query_params.get("grocery_id")
+        paginator = self.pagination_class()
+        return conditional_get(
+            request,
+            [f"items:{grocery_id}" if grocery_id else "items", "groceries", "users"],
+            lambda: paginated_list(
+                request, paginator, query, ItemSerializer, plans.ITEM_PLAN, ordering
+            ),
+            endpoint="item-list",
+        )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every item ``list`` would return as NDJSON or CSV
+        (``?output=csv``)."""
+        fmt, error = export_format(request)
+        if error:
+            return error
+        query, error = self._list_query(request)
+        if error:
+            return error
+        return exports.export_response(query, exports.ITEM_EXPORT_FIELDS, fmt, "items")
+
+    def retrieve(self, request, pk=None):
+        fields = select_fields(request, ItemSerializer)
+        query = NodeQuery(
+            "MATCH (n:Item {uid: $uid})",
+            where=["n.is_deleted = false"],
+            params={"uid": pk},
+            projections=pick(ITEM_RELATED, fields),
+        )
+
+        def build():
+            item = query.first()
+            if item is None:
+                return Response(
+                    {"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+            return Response(ItemSerializer(item, fields=fields).data)
+
+        return conditional_get(
+            request,
+            [f"item:{pk}", "groceries", "users"],
+            build,
+            endpoint="item-detail",
+        )
+
     def create(self, request):
         neo4j_user = request.neo4j_user
         grocery_id = request.data.get("grocery_id")
@@ -317,149 +615,350 @@ class ItemViewSet(viewsets.ViewSet):
             )
 
         try:
-            grocery = Grocery.nodes.get(uid=grocery_id, is_active=True)
+            with atomic():
+                grocery = Grocery.nodes.get(uid=grocery_id, is_active=True)
 
-            if isinstance(neo4j_user, Supplier):
-                supplier_grocery = neo4j_user.responsible_for.single()
-                if not supplier_grocery or supplier_grocery.uid != grocery.uid:
+                if isinstance(neo4j_user, Supplier):
+                    if get_supplier_grocery_uid(request) != grocery.uid:
+                        return Response(
+                            {
+                                "error": "You can only add items to your assigned grocery"
+                            },
+                            status=status.HTTP_403_FORBIDDEN,
+                        )
+
+                serializer = ItemSerializer(data=request.data)
+                if not serializer.is_valid():
                     return Response(
-                        {"error": "You can only add items to your assigned grocery"},
-                        status=status.HTTP_403_FORBIDDEN,
+                        serializer.errors, status=status.HTTP_400_BAD_REQUEST
                     )
 
-            serializer = ItemSerializer(data=request.data)
-            if serializer.is_valid():
                 item = serializer.save()
-                grocery.items.connect(item)
+                rollups.attach_item(grocery.uid, item.uid)
 
                 if isinstance(neo4j_user, Supplier):
                     neo4j_user.added_items.connect(item)
 
-                return Response(
-                    ItemSerializer(item).data, status=status.HTTP_201_CREATED
-                )
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return Response(ItemSerializer(item).data, status=status.HTTP_201_CREATED)
         except Grocery.DoesNotExist:
             return Response(
                 {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-    def update(self, request, pk=None):
-        try:
-            item = Item.nodes.get(uid=pk, is_deleted=False)
-
-            if isinstance(request.neo4j_user, Supplier):
-                supplier_grocery = request.neo4j_user.responsible_for.single()
-                item_grocery = item.belongs_to_grocery.single()
-                if (
-                    not supplier_grocery
-                    or not item_grocery
-                    or supplier_grocery.uid != item_grocery.uid
-                ):
-                    return Response(
-                        {"error": "You can only update items in your assigned grocery"},
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """Create, update and soft-delete many items of one grocery.
 
-            serializer = ItemSerializer(item, data=request.data, partial=True)
-            if serializer.is_valid():
-                item = serializer.save()
-                return Response(ItemSerializer(item).data)
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        except Item.DoesNotExist:
+        Body: ``{"grocery_id": ..., "operations": [{"op": "create", ...},
+        {"op": "update", "uid": ..., ...}, {"op": "delete", "uid": ...}]}``.
+        Suppliers may omit ``grocery_id``. Every operation gets a result at
+        its index; rows of other groceries are reported as ``not_found``.
+        """
+        neo4j_user = request.neo4j_user
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
             return Response(
-                {"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND
+                {"error": "operations must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(operations) > batch.MAX_OPERATIONS:
+            return Response(
+                {"error": f"At most {batch.MAX_OPERATIONS} operations per batch"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-    def destroy(self, request, pk=None):
-        try:
-            item = Item.nodes.get(uid=pk, is_deleted=False)
-
-            if isinstance(request.neo4j_user, Supplier):
-                supplier_grocery = request.neo4j_user.responsible_for.single()
-                item_grocery = item.belongs_to_grocery.single()
-                if (
-                    not supplier_grocery
-                    or not item_grocery
-                    or supplier_grocery.uid != item_grocery.uid
-                ):
-                    return Response(
-                        {"error": "You can only delete items in your assigned grocery"},
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
+        grocery_id = request.data.get("grocery_id")
+        if isinstance(neo4j_user, Supplier):
+            supplier_grocery_uid = get_supplier_grocery_uid(request)
+            grocery_id = grocery_id or supplier_grocery_uid
+            if not supplier_grocery_uid or grocery_id != supplier_grocery_uid:
+                return Response(
+                    {"error": "You can only manage items in your assigned grocery"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+        elif not grocery_id:
+            return Response(
+                {"error": "grocery_id is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-            item.soft_delete()
-            return Response({"message": "Item deleted successfully"})
-        except Item.DoesNotExist:
+        try:
+            Grocery.nodes.get(uid=grocery_id, is_active=True)
+        except Grocery.DoesNotExist:
             return Response(
+                {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        valid, results = batch.validate_operations(operations)
+        results.update(
+            batch.execute(grocery_id, valid, supplier_uid=supplier_scope(request))
+        )
+        results = [results[index] for index in range(len(operations))]
+
+        summary = {}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        return Response(
+            {"grocery_id": grocery_id, "summary": summary, "results": results}
+        )
+
+    def _scoped_item(self, request, pk, forbidden_message):
+        """Fetch a live item the caller may modify in one query.
+
+        Returns ``(item, error_response)``.
+        """
+        query = NodeQuery(
+            "MATCH (n:Item {uid: $uid})",
+            where=["n.is_deleted = false"],
+            params={"uid": pk},
+            projections={"grocery_uid": "head([(g:Grocery)-[:HAS_ITEM]->(n) | g.uid])"},
+        )
+        item, denied = fetch_scoped(query, "HAS_ITEM", supplier_scope(request))
+        if denied == FORBIDDEN:
+            return None, Response(
+                {"error": forbidden_message}, status=status.HTTP_403_FORBIDDEN
+            )
+        if denied:
+            return None, Response(
                 {"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND
             )
+        return item, None
+
+    def update(self, request, pk=None):
+        item, error = self._scoped_item(
+            request, pk, "You can only update items in your assigned grocery"
+        )
+        if error:
+            return error
+
+        serializer = ItemSerializer(item, data=request.data, partial=True)
+        if serializer.is_valid():
+            item = serializer.save()
+            items_changed(item.prefetched.get("grocery_uid"), [item.uid])
+            return Response(ItemSerializer(item).data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def destroy(self, request, pk=None):
+        item, error = self._scoped_item(
+            request, pk, "You can only delete items in your assigned grocery"
+        )
+        if error:
+            return error
+
+        item.soft_delete()
+        return Response({"message": "Item deleted successfully"})
 
 
 class DailyIncomeViewSet(viewsets.ViewSet):
     permission_classes = [IsSupplierOwnerOrAdmin]
     pagination_class = StandardResultsSetPagination
 
-    def list(self, request):
+    def _income_scope(self, request):
+        """Resolve which grocery's incomes the caller may read.
+
+        Returns ``(grocery_id, error_response)``. Admins may narrow to any
+        active grocery via ``?grocery_id=`` (``None`` means all groceries);
+        suppliers are always pinned to their assigned grocery.
+        """
         neo4j_user = request.neo4j_user
         grocery_id = request.query_params.get("grocery_id")
 
         if isinstance(neo4j_user, Admin):
             if grocery_id:
                 try:
-                    grocery = Grocery.nodes.get(uid=grocery_id, is_active=True)
-                    incomes = grocery.daily_incomes.all()
+                    Grocery.nodes.get(uid=grocery_id, is_active=True)
                 except Grocery.DoesNotExist:
-                    return Response(
+                    return None, Response(
                         {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
                     )
-            else:
-                incomes = DailyIncome.nodes.all()
+            return grocery_id or None, None
+
+        supplier_grocery_uid = get_supplier_grocery_uid(request)
+        if not supplier_grocery_uid:
+            return None, Response(
+                {"error": "No grocery assigned"}, status=status.HTTP_403_FORBIDDEN
+            )
+        return supplier_grocery_uid, None
+
+    def _list_query(self, request):
+        """Query for the incomes ``list`` and ``export`` return.
+
+        Returns ``(query, error_response)``.
+        """
+        grocery_id, error = self._income_scope(request)
+        if error:
+            return None, error
+
+        if grocery_id:
+            query = NodeQuery(
+                "MATCH (:Grocery {uid: $grocery_id})-[:HAS_INCOME]->(n:DailyIncome)",
+                params={"grocery_id": grocery_id},
+            )
         else:
-            supplier_grocery = neo4j_user.responsible_for.single()
-            if not supplier_grocery:
+            query = NodeQuery("MATCH (n:DailyIncome)")
+        return query.project(**INCOME_RELATED), None
+
+    def list(self, request):
+        query, error = self._list_query(request)
+        if error:
+            return error
+
+        paginator = self.pagination_class()
+        grocery_id = query.params.get("grocery_id")
+        # The scope is part of the query, but two suppliers share one URL.
+        return conditional_get(
+            request,
+            [
+                f"incomes:{grocery_id}" if grocery_id else "incomes",
+                "groceries",
+                "users",
+            ],
+            lambda: paginated_list(
+                request, paginator, query, DailyIncomeSerializer, plans.INCOME_PLAN
+            ),
+            vary=grocery_id or "",
+        )
+
+    def retrieve(self, request, pk=None):
+        fields = select_fields(request, DailyIncomeSerializer)
+        query = NodeQuery(
+            "MATCH (n:DailyIncome {uid: $uid})",
+            params={"uid": pk},
+            projections=pick(INCOME_RELATED, fields),
+        )
+        supplier_uid = supplier_scope(request)
+
+        def build():
+            income, denied = fetch_scoped(query, "HAS_INCOME", supplier_uid)
+            if denied == FORBIDDEN:
                 return Response(
-                    {"error": "No grocery assigned"}, status=status.HTTP_403_FORBIDDEN
+                    {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
+                )
+            if denied:
+                return Response(
+                    {"error": "Income record not found"},
+                    status=status.HTTP_404_NOT_FOUND,
                 )
-            incomes = supplier_grocery.daily_incomes.all()
+            return Response(DailyIncomeSerializer(income, fields=fields).data)
+
+        # Varies by caller: a 304 then only confirms a read the same supplier
+        # was allowed, under the same assignments
+        return conditional_get(
+            request,
+            ["incomes", "groceries", "users", "assignments"],
+            build,
+            vary=supplier_uid or "",
+        )
 
-        serializer = DailyIncomeSerializer(incomes, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every income ``list`` would return as NDJSON or CSV
+        (``?output=csv``)."""
+        fmt, error = export_format(request)
+        if error:
+            return error
+        query, error = self._list_query(request)
+        if error:
+            return error
+        return exports.export_response(
+            query, exports.INCOME_EXPORT_FIELDS, fmt, "daily-income"
+        )
+
+    @action(detail=False, methods=["get"])
+    def rollup(self, request):
+        """Income totals bucketed by day, ISO week or month."""
+        bucket = request.query_params.get("bucket", "day")
+        if bucket not in ROLLUP_BUCKETS:
+            return Response(
+                {"error": f"bucket must be one of: {', '.join(ROLLUP_BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-    def retrieve(self, request, pk=None):
         try:
-            income = DailyIncome.nodes.get(uid=pk)
-
-            if isinstance(request.neo4j_user, Supplier):
-                supplier_grocery = request.neo4j_user.responsible_for.single()
-                income_grocery = income.grocery.single()
-                if (
-                    not supplier_grocery
-                    or not income_grocery
-                    or supplier_grocery.uid != income_grocery.uid
-                ):
-                    return Response(
-                        {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
-                    )
+            end = parse_date(request.query_params.get("to", ""))
+            start = parse_date(request.query_params.get("from", ""))
+        except ValueError:
+            start = end = None
+        if "to" not in request.query_params:
+            end = timezone.now().date()
+        if end == date.max:
+            # The range below runs to the day after ``to``
+            end = None
+        if "from" not in request.query_params and end:
+            start = max(end, date.min + timedelta(days=30)) - timedelta(days=30)
+        if not start or not end or start > end:
+            return Response(
+                {"error": "from/to must be YYYY-MM-DD dates with from <= to"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        grocery_id, error = self._income_scope(request)
+        if error:
+            return error
+
+        by_grocery = request.query_params.get("group_by") == "grocery"
+        rows = income_rollup(
+            bucket,
+            start,
+            end + timedelta(days=1),
+            grocery_uid=grocery_id,
+            by_grocery=by_grocery,
+        )
+        return Response(
+            {
+                "bucket": bucket,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "results": rows,
+            }
+        )
 
-            serializer = DailyIncomeSerializer(income)
-            return Response(serializer.data)
-        except DailyIncome.DoesNotExist:
+    @action(detail=False, methods=["post"])
+    def upload(self, request):
+        """Import income history from a CSV (``text/csv``, with ``date`` and
+        ``amount`` columns) or NDJSON (``application/x-ndjson``) body.
+
+        The body is streamed, never buffered; rows are upserted on
+        (grocery, day). Admins choose the grocery with ``?grocery_id=``.
+        """
+        fmt = uploads.upload_format(request.content_type)
+        if fmt is None:
+            return Response(
+                {"error": "Content-Type must be text/csv or application/x-ndjson"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        grocery_id, error = self._income_scope(request)
+        if error:
+            return error
+        if not grocery_id:
+            return Response(
+                {"error": "grocery_id is required for admins"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Read the raw request stream: touching request.data would buffer and
+        # parse the whole body.
+        stream = request.stream
+        if stream is None:
             return Response(
-                {"error": "Income record not found"}, status=status.HTTP_404_NOT_FOUND
+                {"error": "Request body is empty"}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        summary = uploads.import_incomes(
+            stream, fmt, grocery_id, supplier_uid=supplier_scope(request)
+        )
+        return Response(summary.as_dict())
+
     def create(self, request):
         neo4j_user = request.neo4j_user
         grocery_id = request.data.get("grocery_id")
 
         if isinstance(neo4j_user, Supplier):
-            supplier_grocery = neo4j_user.responsible_for.single()
-            if not supplier_grocery:
+            grocery_uid = get_supplier_grocery_uid(request)
+            if not grocery_uid:
                 return Response(
                     {"error": "No grocery assigned"}, status=status.HTTP_403_FORBIDDEN
                 )
-            grocery = supplier_grocery
         else:
             # Admin can specify grocery
             if not grocery_id:
@@ -468,7 +967,7 @@ class DailyIncomeViewSet(viewsets.ViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             try:
-                grocery = Grocery.nodes.get(uid=grocery_id, is_active=True)
+                grocery_uid = Grocery.nodes.get(uid=grocery_id, is_active=True).uid
             except Grocery.DoesNotExist:
                 return Response(
                     {"error": "Grocery not found"}, status=status.HTTP_404_NOT_FOUND
@@ -476,11 +975,12 @@ class DailyIncomeViewSet(viewsets.ViewSet):
 
         serializer = DailyIncomeSerializer(data=request.data)
         if serializer.is_valid():
-            income = serializer.save()
-            grocery.daily_incomes.connect(income)
+            with atomic():
+                income = serializer.save()
+                rollups.attach_income(grocery_uid, income.uid)
 
-            if isinstance(neo4j_user, Supplier):
-                neo4j_user.recorded_incomes.connect(income)
+                if isinstance(neo4j_user, Supplier):
+                    neo4j_user.recorded_incomes.connect(income)
 
             return Response(
                 DailyIncomeSerializer(income).data, status=status.HTTP_201_CREATED
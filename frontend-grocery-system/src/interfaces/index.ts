@@ -37,6 +37,11 @@ export interface DailyIncome {
   updated_at?: string;
 }
 
+export interface Page<T> {
+  next: string | null;
+  results: T[];
+}
+
 export interface LoginResponse {
   user: ApiUser;
   tokens: { access: string; refresh: string };
@@ -1,5 +1,5 @@
 import axios from "axios";
-import type { LoginResponse, Grocery as GroceryT, ApiUser, Item as ItemT, DailyIncome as IncomeT } from "../interfaces";
+import type { LoginResponse, Grocery as GroceryT, ApiUser, Item as ItemT, DailyIncome as IncomeT, Page } from "../interfaces";
 
 const API_BASE_URL = (import.meta as any).env.VITE_API_BASE_URL || "http://localhost:8000/api";
 
@@ -16,6 +16,19 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+async function listAll<T>(url: string, params?: Record<string, unknown>): Promise<T[]> {
+  const results: T[] = [];
+  let next: string | null = url;
+  let query = params;
+  while (next) {
+    const { data }: { data: Page<T> } = await api.get<Page<T>>(next, { params: query });
+    results.push(...data.results);
+    next = data.next;
+    query = undefined;
+  }
+  return results;
+}
+
 export const AuthAPI = {
   async login(payload: { email: string; password: string }): Promise<LoginResponse> {
     const { data } = await api.post<LoginResponse>("/auth/login/", payload);
@@ -29,8 +42,7 @@ export const AuthAPI = {
 
 export const GroceryAPI = {
   async list() {
-    const { data } = await api.get("/groceries/");
-    return data as GroceryT[];
+    return listAll<GroceryT>("/groceries/");
   },
   async create(payload: { name: string; location: string }) {
     const { data } = await api.post("/groceries/", payload);
@@ -52,8 +64,7 @@ export const GroceryAPI = {
 
 export const UsersAPI = {
   async list() {
-    const { data } = await api.get("/users/");
-    return data as ApiUser[];
+    return listAll<ApiUser>("/users/");
   },
   async update(uid: string, payload: Partial<{ name: string; email: string; is_active: boolean }>) {
     const { data } = await api.put(`/users/${uid}/`, payload);
@@ -73,10 +84,25 @@ export const UsersAPI = {
   },
 };
 
+// `fields` / `exclude` take comma-separated field names; the backend then
+// skips the lookups behind any field that is left out.
+type ListParams = { grocery_id?: string; fields?: string; exclude?: string };
+
+// Filters and ordering evaluated server-side by /items/ (see api/filters.py)
+type ItemListParams = ListParams & {
+  item_type?: string;
+  item_location?: string;
+  name_prefix?: string;
+  min_price?: number;
+  max_price?: number;
+  created_after?: string;
+  created_before?: string;
+  ordering?: "created_at" | "-created_at" | "price" | "-price" | "name" | "-name";
+};
+
 export const ItemsAPI = {
-  async list(params?: { grocery_id?: string }) {
-    const { data } = await api.get(`/items/`, { params });
-    return data as ItemT[];
+  async list(params?: ItemListParams) {
+    return listAll<ItemT>(`/items/`, params);
   },
   async create(payload: { name: string; item_type: string; item_location: string; price: number; grocery_id: string }) {
     const { data } = await api.post(`/items/`, payload);
@@ -93,9 +119,8 @@ export const ItemsAPI = {
 };
 
 export const IncomesAPI = {
-  async list(params?: { grocery_id?: string }) {
-    const { data } = await api.get(`/daily-income/`, { params });
-    return data as IncomeT[];
+  async list(params?: ListParams) {
+    return listAll<IncomeT>(`/daily-income/`, params);
   },
   async create(payload: { date: string; amount: number; grocery_id?: string }) {
     const { data } = await api.post(`/daily-income/`, payload);
@@ -20,13 +20,13 @@ export default function IncomesPage() {
   useEffect(() => {
     if (!user) return navigate("/login");
     (async () => {
-      setIncomes(await IncomesAPI.list());
+      setIncomes(await IncomesAPI.list({ exclude: "recorded_by_name" }));
     })();
   }, [user, navigate]);
 
   const load = async () => {
     try {
-      const data = await IncomesAPI.list(groceryId ? { grocery_id: groceryId } : undefined);
+      const data = await IncomesAPI.list({ grocery_id: groceryId || undefined, exclude: "recorded_by_name" });
       setIncomes(data);
     } catch (e: any) { setError("Failed to load incomes"); }
   };
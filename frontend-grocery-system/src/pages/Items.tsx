@@ -25,7 +25,7 @@ export default function ItemsPage() {
       return;
     }
     (async () => {
-      setItems(await ItemsAPI.list());
+      setItems(await ItemsAPI.list({ exclude: "grocery_name,added_by_name" }));
     })();
   }, [user, navigate]);
 